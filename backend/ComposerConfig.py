@@ -0,0 +1,92 @@
+import json
+from typing import NamedTuple
+
+from pypond import PondScore
+
+STAGE_KEYS = ('PITCH_UNIVERSE', 'VOICE_TYPES', 'SHUFFLE_SILENCE', 'TIME_SIGNATURE')
+DIRECTIONS = 6
+
+
+class StageConfig(NamedTuple):
+    pitch_universe: tuple
+    voice_types: tuple
+    shuffle_silence: bool
+    time_signature: tuple
+    pond_time_signature: object
+
+    @property
+    def duration(self):
+        return self.time_signature[0]
+
+
+class ComposerConfig:
+    def __init__(self, stages):
+        self.stages = tuple(stages)
+
+    def __getitem__(self, stage):
+        return self.stages[stage]
+
+    def __len__(self):
+        return len(self.stages)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        try:
+            composer_data = data['COMPOSER_DATA']
+        except (KeyError, TypeError):
+            raise ValueError(f"{file_path}: missing COMPOSER_DATA")
+        if not isinstance(composer_data, dict) or not composer_data:
+            raise ValueError(f"{file_path}: COMPOSER_DATA must map stage numbers to stages")
+        stages = []
+        for stage in range(len(composer_data)):
+            if str(stage) not in composer_data:
+                raise ValueError(f"{file_path}: stages must be numbered 0 to "
+                                 f"{len(composer_data) - 1}, stage {stage} is missing")
+            stages.append(cls.parse_stage(composer_data[str(stage)],
+                                          f"{file_path}, stage {stage}"))
+        return cls(stages)
+
+    @staticmethod
+    def parse_stage(stage_data, location):
+        if not isinstance(stage_data, dict):
+            raise ValueError(f"{location}: expected an object")
+        missing = [key for key in STAGE_KEYS if key not in stage_data]
+        if missing:
+            raise ValueError(f"{location}: missing {', '.join(missing)}")
+
+        pitch_universe = stage_data['PITCH_UNIVERSE']
+        if not isinstance(pitch_universe, list) or not pitch_universe:
+            raise ValueError(f"{location}: PITCH_UNIVERSE must be a non-empty list")
+        if not all(isinstance(pitch, int) for pitch in pitch_universe):
+            raise ValueError(f"{location}: PITCH_UNIVERSE must only hold integers")
+        if list(pitch_universe) != sorted(set(pitch_universe)):
+            raise ValueError(f"{location}: PITCH_UNIVERSE must be sorted and unique")
+
+        if not isinstance(stage_data['VOICE_TYPES'], dict):
+            raise ValueError(f"{location}: VOICE_TYPES must map directions to voice lists")
+        voice_types = []
+        for direction in range(DIRECTIONS):
+            types = stage_data['VOICE_TYPES'].get(str(direction))
+            if not types or not isinstance(types, list):
+                raise ValueError(f"{location}: VOICE_TYPES has no entry "
+                                 f"for direction {direction}")
+            for voices in types:
+                if (not isinstance(voices, list) or len(voices) != 3
+                        or not all(isinstance(voice, int) for voice in voices)):
+                    raise ValueError(f"{location}: VOICE_TYPES {direction} holds "
+                                     f"{voices}, expected three integers")
+            voice_types.append(tuple(tuple(voices) for voices in types))
+
+        time_signature = stage_data['TIME_SIGNATURE']
+        if (not isinstance(time_signature, list) or len(time_signature) != 2
+                or not all(isinstance(value, int) and value > 0
+                           for value in time_signature)):
+            raise ValueError(f"{location}: TIME_SIGNATURE must be two positive integers")
+
+        return StageConfig(tuple(pitch_universe),
+                           tuple(voice_types),
+                           bool(stage_data['SHUFFLE_SILENCE']),
+                           tuple(time_signature),
+                           PondScore.PondTimeSignature(*time_signature))
@@ -0,0 +1,121 @@
+import argparse
+import struct
+import sys
+from os import path, makedirs
+from time import perf_counter, strftime
+
+from backend.headless import HeadlessComposer, DATA_PATH
+
+MAGIC = b'TASTELOG'
+VERSION = 1
+HEADER = struct.Struct('<8sBq')
+RECORD_TYPE = struct.Struct('<B')
+UPDATE = struct.Struct('<dddH')
+MEASURE = struct.Struct('<dQBdd')
+UPDATE_RECORD = 1
+MEASURE_RECORD = 2
+
+
+class EventLog:
+    def __init__(self, file_path, seed):
+        directory = path.dirname(file_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+        self.file_path = file_path
+        self.seed = seed
+        self.start = perf_counter()
+        self.file = open(file_path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+            self.file.flush()
+
+    @classmethod
+    def new_performance(cls, directory, seed):
+        return cls(path.join(directory, f"performance_{strftime('%Y%m%d_%H%M%S')}.tlog"),
+                   seed)
+
+    def elapsed(self):
+        return perf_counter() - self.start
+
+    def write(self, record_type, data):
+        self.file.write(RECORD_TYPE.pack(record_type) + data)
+        self.file.flush()
+
+    def log_update(self, values):
+        command = str(values.get('COMMAND', '')).encode('utf-8')[:0xFFFF]
+        self.write(UPDATE_RECORD, UPDATE.pack(self.elapsed(), values.get('VOLUME', 0),
+                                              values.get('DIRECTION', 0),
+                                              len(command)) + command)
+
+    def log_measure(self, measure):
+        stage, direction, volume = measure.state
+        self.write(MEASURE_RECORD, MEASURE.pack(self.elapsed(), measure.index, stage,
+                                                direction, volume))
+
+    def close(self):
+        self.file.close()
+
+
+def read_events(file_path):
+    with open(file_path, 'rb') as file:
+        magic, version, seed = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{file_path} is not a version {VERSION} event log")
+        yield 'seed', seed
+        while True:
+            record_type = file.read(RECORD_TYPE.size)
+            if len(record_type) < RECORD_TYPE.size:
+                return
+            record_type = RECORD_TYPE.unpack(record_type)[0]
+            if record_type == UPDATE_RECORD:
+                data = file.read(UPDATE.size)
+                if len(data) < UPDATE.size:
+                    return
+                time, volume, direction, length = UPDATE.unpack(data)
+                command = file.read(length).decode('utf-8', errors='replace')
+                yield 'update', (time, volume, direction, command)
+            elif record_type == MEASURE_RECORD:
+                data = file.read(MEASURE.size)
+                if len(data) < MEASURE.size:
+                    return
+                yield 'measure', MEASURE.unpack(data)
+            else:
+                raise ValueError(f"{file_path}: unknown record type {record_type}")
+
+
+def replay(file_path, data_path=DATA_PATH, parts_directory=None):
+    headless = None
+    updates = 0
+    for event, data in read_events(file_path):
+        if event == 'seed':
+            headless = HeadlessComposer(data_path, data, parts_directory)
+        elif event == 'update':
+            updates += 1
+        elif event == 'measure':
+            _, index, stage, direction, volume = data
+            headless.composer.set_state(stage, direction, volume)
+            headless.composer.compose(index)
+            headless.measure_number += 1
+    return headless, updates
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Regenerate a performance from its "
+                                                 "event log.")
+    parser.add_argument('log')
+    parser.add_argument('-o', '--output', default='replay.ly')
+    args = parser.parse_args(arguments)
+
+    start = perf_counter()
+    parts_directory = path.splitext(args.output)[0] + '_parts'
+    headless, updates = replay(args.log, parts_directory=parts_directory)
+    with open(args.output, 'w') as file:
+        file.write(headless.complete_score(parts_directory,
+                                           path.dirname(path.abspath(args.output))))
+    headless.close()
+    print(f"Replayed {headless.measure_number} measures and {updates} updates "
+          f"in {perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from math import sqrt, modf
-from random import choices, randint, choice, uniform, shuffle
+from random import Random
 
 from backend.pypond_extensions import LilypondScripts
 from pypond.PondMarks import Articulations, Dynamics, MiscMarks
@@ -33,8 +33,9 @@ class ComposerBase(ABC):
                      5: Dynamics.fortissimo,
                      6: Dynamics.custom_dynamic("f", 3)}
 
-    def __init__(self, instruments=None):
+    def __init__(self, instruments=None, rng=None):
         self.instruments = instruments or {}
+        self.rng = rng or Random()
         self.dynamic = Dynamics.pianissimo
 
     @abstractmethod
@@ -42,7 +43,7 @@ class ComposerBase(ABC):
         pass
 
     @abstractmethod
-    def compose(self, pitch_universe, direction, volume, voice_data) -> dict:
+    def compose(self, pitch_universe, direction, volume, voice_data, table=None) -> dict:
         pass
 
     @classmethod
@@ -75,10 +76,12 @@ class ComposerBase(ABC):
 
     def instrument_order(self):
         instruments = [instrument for instrument in self.instruments]
-        shuffle(instruments)
+        self.rng.shuffle(instruments)
         return instruments
 
-    def get_voice_pitch_universe(self, pitch_universe, instrument):
+    def get_voice_pitch_universe(self, pitch_universe, instrument, table=None):
+        if table is not None:
+            return table.instruments[instrument]
         instrument = self.instruments[instrument]
         return instrument.limit_pitch_universe(pitch_universe)
 
@@ -130,7 +133,7 @@ class ComposerBase(ABC):
         fragment.append_fragment(main_fragment)
         last_pitch = pitch_universe[index_route[-1]]
         if extended and climax:
-            note_duration = choice((0.2, 0.25, 1 / 3, 0.5, 0.75))
+            note_duration = self.rng.choice((0.2, 0.25, 1 / 3, 0.5, 0.75))
             repeated = self.compose_repeated(last_pitch, 1, note_duration)
             first_note = repeated.ordered_notes()[0]
             first_note.dynamic = Dynamics.sforzando
@@ -185,7 +188,7 @@ class ComposerBase(ABC):
             bonus_fragment = self.long_glissando(duration=2,
                                                  start_pitch=target_pitch)
         elif extension_type == 1:
-            note_duration = choice(self.repeat_durations)
+            note_duration = self.rng.choice(self.repeat_durations)
             bonus_fragment = self.compose_repeated(target_pitch, 2, note_duration, volume)
         else:
             bonus_fragment = PondNote(target_pitch, 6,
@@ -198,8 +201,7 @@ class ComposerBase(ABC):
         fragment.append_fragment(bonus_fragment)
         return fragment
 
-    @classmethod
-    def build_index_route(cls, note_amount, max_index, target_index=None):
+    def build_index_route(self, note_amount, max_index, target_index=None):
         route_fragments = ((1, 1, 1, -2, 1),
                            (1, 1, -1, 1, 1),
                            (-2, 1, 1, 1, 1),
@@ -208,26 +210,26 @@ class ComposerBase(ABC):
                            (2, -2, 1, 1, 1),
                            (2, -1, 1, 1, -1),
                            (2, -1, -1, -1, -1))
-        current = randint(0, 1)
+        current = self.rng.randint(0, 1)
         index_route = []
-        route_fragment = iter(choice(route_fragments))
+        route_fragment = iter(self.rng.choice(route_fragments))
         for _ in range(note_amount):
             index_route.append(current)
             try:
                 addition = next(route_fragment)
 
             except StopIteration:
-                route_fragment = iter(choice(route_fragments))
+                route_fragment = iter(self.rng.choice(route_fragments))
                 addition = next(route_fragment)
-            current = cls.next_index_number(current, addition, max_index)
+            current = self.next_index_number(current, addition, max_index)
         if target_index is not None and target_index != index_route[-1]:
             diff = target_index - index_route[-1]
             addition = diff // abs(diff)
             for idx in range(len(index_route)):
                 index = index_route[idx]
                 for _ in range(abs(diff)):
-                    index = cls.next_index_number(index, addition,
-                                                  max_index)
+                    index = self.next_index_number(index, addition,
+                                                   max_index)
                 index_route[idx] = index
         return index_route
 
@@ -246,7 +248,7 @@ class ComposerBase(ABC):
             multiplier = volume + ((1 - volume) / 2)
             size = len(pitch_universe) - 2
             max_index = int(multiplier * size)
-            start_idx = randint(0, max_index)
+            start_idx = self.rng.randint(0, max_index)
             trill_idx = start_idx + 1
             start_pitch, trill_pitch = pitch_universe[start_idx], pitch_universe[trill_idx]
         else:
@@ -399,7 +401,7 @@ class ComposerBase(ABC):
     def compose_glissando(self, start_pitch, duration, volume=0.,
                           extended=False):
         fragment = PondFragment()
-        start_position = choice([0., 0.25, 0.5, 0.75])
+        start_position = self.rng.choice([0., 0.25, 0.5, 0.75])
         if extended:
             start_position %= 0.5
         silence = self.compose_silence(start_position)
@@ -411,7 +413,7 @@ class ComposerBase(ABC):
             duration = fragment.real_duration
             new_start = (duration + start_position + 0.5) % 1
             fragment.append_fragment(self.compose_silence(0.5))
-            jump = randint(1, 2 + int(volume) * 3)
+            jump = self.rng.randint(1, 2 + int(volume) * 3)
             new_glissando = self.long_glissando(start_pitch + jump, duration, new_start)
             fragment.append_fragment(new_glissando)
 
@@ -465,8 +467,8 @@ class ComposerEmpty(ComposerBase):
                     'español': '"Respira naturalmente. '
                                'Expulsa el aire con fuerza a través del instrumento."'}
 
-    def __init__(self, instruments=None, language='english'):
-        super().__init__(instruments)
+    def __init__(self, instruments=None, language='english', rng=None):
+        super().__init__(instruments, rng)
         self.language = language
 
     def set_dynamic(self, direction, volume):
@@ -495,8 +497,8 @@ class ComposerEmpty(ComposerBase):
 
 
 class ComposerA(ComposerBase):
-    def __init__(self, instruments=None):
-        super().__init__(instruments)
+    def __init__(self, instruments=None, rng=None):
+        super().__init__(instruments, rng)
         self.dynamic = Dynamics.pianissimo
 
     def set_dynamic(self, direction, volume):
@@ -521,7 +523,7 @@ class ComposerA(ComposerBase):
 
         return tuplet_weights
 
-    def compose(self, pitch_universe, direction, volume, voice_data) -> dict:
+    def compose(self, pitch_universe, direction, volume, voice_data, table=None) -> dict:
         lines = {}
         used_tuplets = []
         instrument_order = self.instrument_order()
@@ -530,9 +532,9 @@ class ComposerA(ComposerBase):
         for voice_type, silence in voice_data:
             instrument = instrument_order.pop()
             temp_universe = self.get_voice_pitch_universe(pitch_universe,
-                                                          instrument)
+                                                          instrument, table)
             voice_pitch_universe = self.get_pitch_universe(temp_universe, volume)
-            extended = randint(3, 5) < direction
+            extended = self.rng.randint(3, 5) < direction
             climax = True if direction > 3 else False
             tuplet_type = self.tuplet_type(used_tuplets, volume)
             if voice_type == 1:
@@ -559,16 +561,15 @@ class ComposerA(ComposerBase):
 
         filtered = filter(tuplet_filter, self.get_tuplet_weights(volume).items())
         types, weights = zip(*filtered)
-        return choices(types, weights=weights)[0]
+        return self.rng.choices(types, weights=weights)[0]
 
-    @classmethod
-    def get_pitch_universe(cls, pitch_universe, volume):
+    def get_pitch_universe(self, pitch_universe, volume):
         max_index = len(pitch_universe) - 1
         index_range = min(max(5,
                               int(max_index * volume * 1.5)),
                           max_index)
         max_start = min(max_index - index_range, int(max_index * volume) + 1)
-        start = randint(0, max_start)
+        start = self.rng.randint(0, max_start)
         return pitch_universe[start: start + index_range]
 
     @classmethod
@@ -588,7 +589,7 @@ class ComposerA(ComposerBase):
             else:
                 return self.compose_silence(6.)
         remaining_duration = 6 - silence
-        duration = randint(min_duration, remaining_duration)
+        duration = self.rng.randint(min_duration, remaining_duration)
         if voice_type == 2:
             duration = min(duration, 5 - silence)
             music_fragment = self.compose_trill_fragment(pitch_universe,
@@ -614,8 +615,8 @@ class ComposerA(ComposerBase):
 
 class ComposerB(ComposerBase):
 
-    def __init__(self, instruments=None):
-        super().__init__(instruments)
+    def __init__(self, instruments=None, rng=None):
+        super().__init__(instruments, rng)
         self.dynamic = Dynamics.forte
 
     def set_dynamic(self, direction, volume):
@@ -634,18 +635,18 @@ class ComposerB(ComposerBase):
     def volume_calculator(volume):
         return (sqrt(volume) / 3) - 0.5
 
-    def compose(self, pitch_universe, direction, volume, voice_data) -> dict:
+    def compose(self, pitch_universe, direction, volume, voice_data, table=None) -> dict:
         lines = {}
         instrument_order = self.instrument_order()
 
-        duration = max(2, min(5, randint(1, direction + 1)))
+        duration = max(2, min(5, self.rng.randint(1, direction + 1)))
         volume = volume
-        extended = randint(2, 4) < direction
+        extended = self.rng.randint(2, 4) < direction
 
         for voice_type, silence in voice_data:
             instrument = instrument_order.pop()
             voice_pitch_universe = self.get_voice_pitch_universe(pitch_universe,
-                                                                 instrument)
+                                                                 instrument, table)
             new_fragment = self.compose_instrument(voice_pitch_universe, duration,
                                                    voice_type, silence, volume,
                                                    extended)
@@ -658,7 +659,7 @@ class ComposerB(ComposerBase):
         duration = min(6 - silence, duration)
         if voice_type == 0:
             if extended:
-                tuplet_type = choice(["3", "4", "5"])
+                tuplet_type = self.rng.choice(["3", "4", "5"])
                 duration = max(4, duration)
                 fragment = self.compose_melodic_fragment(pitch_universe, duration - 1, True,
                                                          tuplet_type, False, volume)
@@ -670,8 +671,8 @@ class ComposerB(ComposerBase):
             start_silence = PondFragment()
         if voice_type == 1:
             max_index = min(len(pitch_universe) - 3, abs(int(volume * len(pitch_universe)))) + 2
-            main_pitch = choice(pitch_universe[:max_index])
-            note_duration_idx = randint(0, min(6, duration + 1))
+            main_pitch = self.rng.choice(pitch_universe[:max_index])
+            note_duration_idx = self.rng.randint(0, min(6, duration + 1))
             note_duration = self.repeat_durations[note_duration_idx]
             new_fragment = self.compose_repeated(main_pitch, duration - 1,
                                                  note_duration, volume,
@@ -680,7 +681,7 @@ class ComposerB(ComposerBase):
             if extended:
                 duration = 2
             middle_point = len(pitch_universe) // 2
-            main_pitch = choice(pitch_universe[-middle_point:-1])
+            main_pitch = self.rng.choice(pitch_universe[-middle_point:-1])
             new_fragment = self.compose_glissando(main_pitch, duration,
                                                   volume, extended)
 
@@ -689,8 +690,8 @@ class ComposerB(ComposerBase):
 
 
 class ComposerC(ComposerBase):
-    def __init__(self, instruments=None, language="english"):
-        super().__init__(instruments)
+    def __init__(self, instruments=None, language="english", rng=None):
+        super().__init__(instruments, rng)
         self.language = language
 
     def set_dynamic(self, direction, volume):
@@ -705,20 +706,26 @@ class ComposerC(ComposerBase):
             dynamic += 1
         self.dynamic = self.dynamics_data[dynamic]
 
-    def compose(self, pitch_universe, direction, volume, voice_data) -> dict:
+    def compose(self, pitch_universe, direction, volume, voice_data, table=None) -> dict:
         lines = {}
         instrument_order = self.instrument_order()
         silence = 0
-        shared_universe = self.shared_pitch_universe(pitch_universe,
-                                                     self.instruments.values())
+        if table is not None:
+            shared_universe = table.shared
+        else:
+            shared_universe = self.shared_pitch_universe(pitch_universe,
+                                                         self.instruments.values())
         max_index = len(shared_universe) - 1
         start_pitch_index = max_index - int(direction * 1.5)
         start_pitch = shared_universe[start_pitch_index]
-        pitch_index = pitch_universe.index(start_pitch)
+        if table is not None:
+            pitch_index = table.index[start_pitch]
+        else:
+            pitch_index = pitch_universe.index(start_pitch)
         for _, fragment_type in voice_data:
             instrument = instrument_order.pop()
             voice_pitch_universe = self.get_voice_pitch_universe(pitch_universe,
-                                                                 instrument)
+                                                                 instrument, table)
             new_fragment = self.compose_instrument(voice_pitch_universe, volume,
                                                    fragment_type, silence,
                                                    pitch_index)
@@ -729,7 +736,7 @@ class ComposerC(ComposerBase):
 
     @classmethod
     def shared_pitch_universe(cls, pitch_universe, instruments):
-        universe = pitch_universe.copy()
+        universe = list(pitch_universe)
         for instrument in instruments:
             universe = instrument.limit_pitch_universe(universe)
         return universe
@@ -741,7 +748,7 @@ class ComposerC(ComposerBase):
         duration = 3
         if fragment_type == 3:
             return ComposerEmpty.compose_instrument(8)
-        tuplet_type = choice(["3", "4", "5", "6"])
+        tuplet_type = self.rng.choice(["3", "4", "5", "6"])
         melodic_fragment = self.compose_target_melodic_fragment(pitch_universe, main_index,
                                                                 duration, tuplet_type,
                                                                 volume, fragment_type)
@@ -753,8 +760,8 @@ class ComposerC(ComposerBase):
 class ComposerD(ComposerBase):
     noise_pitches = [0, 4, 7]
 
-    def __init__(self, instruments=None):
-        super().__init__(instruments)
+    def __init__(self, instruments=None, rng=None):
+        super().__init__(instruments, rng)
 
     def set_dynamic(self, direction, volume):
         dyn_dict = {0: 1,
@@ -766,7 +773,7 @@ class ComposerD(ComposerBase):
         dynamic = dyn_dict[direction]
         self.dynamic = self.dynamics_data[dynamic]
 
-    def compose(self, pitch_universe, direction, volume, voice_data) -> dict:
+    def compose(self, pitch_universe, direction, volume, voice_data, table=None) -> dict:
         lines = {}
         instrument_order = self.instrument_order()
         max_duration = max(3, 7 - direction)
@@ -774,8 +781,8 @@ class ComposerD(ComposerBase):
         for voice_type, silence in voice_data:
             instrument = instrument_order.pop()
             voice_pitch_universe = self.get_voice_pitch_universe(pitch_universe,
-                                                                 instrument)
-            duration = randint(3, max_duration)
+                                                                 instrument, table)
+            duration = self.rng.randint(3, max_duration)
             new_fragment = self.compose_instrument(voice_pitch_universe[:max_index],
                                                    duration, volume,
                                                    silence, voice_type)
@@ -788,10 +795,10 @@ class ComposerD(ComposerBase):
         if voice_type == 0:
             max_idx = min(3, 1 + int(3 * volume))
             available = self.noise_pitches[:max_idx]
-            pitch = choice(available)
+            pitch = self.rng.choice(available)
             melodic_fragment = self.compose_noise_note(duration, pitch)
         elif voice_type == 1:
-            tuplet_type = choice(["4", "5", "6"])
+            tuplet_type = self.rng.choice(["4", "5", "6"])
             melodic_fragment = self.compose_melodic_fragment(pitch_universe,
                                                              duration,
                                                              tuplet_type=tuplet_type,
@@ -0,0 +1,117 @@
+import subprocess
+from os import path, makedirs
+from queue import Queue, Empty
+from threading import Thread
+
+from backend.RenderPool import render_source
+
+
+class LilypondWorker:
+    done_marker = 'ly-render-done'
+    failed_marker = 'ly-render-failed'
+
+    def __init__(self, directory, resolution=180, command='lilypond', timeout=30):
+        self.directory = directory
+        self.resolution = resolution
+        self.command = command
+        self.timeout = timeout
+        self.process = None
+        self.output = Queue()
+
+    def start(self):
+        self.process = subprocess.Popen([self.command, '--png',
+                                         f'-dresolution={self.resolution}',
+                                         'scheme-sandbox'],
+                                        cwd=self.directory, text=True, bufsize=1,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        self.output = Queue()
+        Thread(target=self.read_output, args=(self.process, self.output),
+               daemon=True).start()
+
+    @staticmethod
+    def read_output(process, output):
+        for line in process.stdout:
+            output.put(line)
+        output.put(None)
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def render(self, source, output_base):
+        if not self.alive():
+            self.start()
+        name = path.basename(output_base)
+        with open(path.join(self.directory, name + '.ly'), 'w') as file:
+            file.write(source)
+        self.process.stdin.write(f'(begin (lilypond-file (lambda (key file) '
+                                 f'(display "{self.failed_marker}\\n")) "{name}.ly") '
+                                 f'(display "{self.done_marker}\\n") (force-output))\n')
+        self.process.stdin.flush()
+        while True:
+            line = self.output.get(timeout=self.timeout)
+            if line is None:
+                raise RuntimeError("LilyPond worker exited")
+            if self.failed_marker in line:
+                raise RuntimeError(f"LilyPond worker could not render {name}")
+            if self.done_marker in line:
+                break
+        image_path = path.join(self.directory, name + '.png')
+        if not path.exists(image_path):
+            raise RuntimeError(f"LilyPond worker did not write {image_path}")
+        return output_base + '.png'
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process = None
+
+
+class LilypondServer:
+    max_failures = 3
+
+    def __init__(self, directory, workers=2, resolution=180, command='lilypond',
+                 timeout=30):
+        self.directory = path.abspath(directory)
+        self.resolution = resolution
+        self.command = command
+        self.failures = 0
+        self.idle = Queue()
+        makedirs(self.directory, exist_ok=True)
+        for _ in range(workers):
+            self.idle.put(LilypondWorker(self.directory, resolution, command, timeout))
+
+    @property
+    def enabled(self):
+        return self.failures < self.max_failures
+
+    def warm_up(self):
+        workers = [self.idle.get() for _ in range(self.idle.qsize())]
+        for worker in workers:
+            try:
+                worker.start()
+            except OSError as exception:
+                print("Could not start LilyPond worker:", exception)
+                self.failures = self.max_failures
+            self.idle.put(worker)
+
+    def render(self, source, output_base):
+        if self.enabled and path.dirname(path.abspath(output_base)) == self.directory:
+            worker = self.idle.get()
+            try:
+                image_path = worker.render(source, output_base)
+                self.failures = 0
+                return image_path
+            except (OSError, RuntimeError, Empty) as exception:
+                print("LilyPond worker failed, rendering with a new process:",
+                      repr(exception))
+                worker.stop()
+                self.failures += 1
+            finally:
+                self.idle.put(worker)
+        return render_source(source, output_base, self.resolution, self.command)
+
+    def shutdown(self):
+        while not self.idle.empty():
+            self.idle.get().stop()
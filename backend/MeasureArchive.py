@@ -0,0 +1,85 @@
+from collections import deque
+from os import path, makedirs
+from shutil import copyfile
+
+
+def copy_prefix(source_path, target_path, size=None, block_size=64 * 1024):
+    if size is None:
+        copyfile(source_path, target_path)
+        return
+    with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+        while size > 0:
+            block = source.read(min(block_size, size))
+            if not block:
+                break
+            target.write(block)
+            size -= len(block)
+
+
+class MeasureArchive:
+    block_size = 64 * 1024
+
+    def __init__(self, directory, parts=3, window=64, write_through=False):
+        self.directory = path.abspath(directory)
+        self.parts = parts
+        self.window = window
+        self.write_through = write_through
+        self.recent = deque(maxlen=window if write_through else None)
+        self.measure_count = 0
+        self.spilled_count = 0
+        makedirs(self.directory, exist_ok=True)
+        self.spill_paths = [path.join(self.directory, f"spill_{idx}.ily")
+                            for idx in range(parts)]
+        self.spill_files = [open(spill_path, 'w') for spill_path in self.spill_paths]
+
+    def append(self, melodies):
+        self.recent.append(list(melodies))
+        self.measure_count += 1
+        if self.write_through:
+            self.spill(melodies)
+            return
+        while len(self.recent) > self.window:
+            self.spill(self.recent.popleft())
+
+    def spill(self, melodies):
+        for file, melody in zip(self.spill_files, melodies):
+            file.write(str(melody) + '\n')
+            file.flush()
+        self.spilled_count += 1
+
+    def recent_melodies(self, idx):
+        return [melodies[idx] for melodies in self.recent]
+
+    def chunks(self, idx):
+        with open(self.spill_paths[idx], 'r') as file:
+            for block in iter(lambda: file.read(self.block_size), ''):
+                yield block
+        if self.write_through:
+            return
+        for melody in self.recent_melodies(idx):
+            yield str(melody) + '\n'
+
+    def part_string(self, idx):
+        return ''.join(self.chunks(idx))
+
+    def write_part(self, idx, file_path):
+        with open(file_path, 'w') as file:
+            for chunk in self.chunks(idx):
+                file.write(chunk)
+        return path.abspath(file_path)
+
+    def part_path(self, idx, file_path=None):
+        if self.write_through and file_path is None:
+            return self.spill_paths[idx]
+        return self.write_part(idx, file_path or path.join(self.directory,
+                                                           f"part_{idx}.ily"))
+
+    def part_size(self, idx):
+        return path.getsize(self.spill_paths[idx]) if self.write_through else None
+
+    def close(self):
+        for file in self.spill_files:
+            file.close()
+
+    def __len__(self):
+        return self.measure_count
@@ -1,24 +1,61 @@
 from PyQt5.QtCore import QObject, pyqtSlot, pyqtSignal, QTimer
 from pypond.PondFile import PondDoc, PondRender
-from pypond.PondCommand import PondHeader, PondPaper
-from backend.pypond_extensions import LilypondScripts
+from pypond.PondCommand import PondHeader
+from pypond import PondScore
+from backend.pypond_extensions import LilypondScripts, MainDoc, PartDoc
+from backend.MeasureArchive import copy_prefix
+from backend.EventLog import EventLog
 from backend.TasteComposer import MainComposer
-from backend.pond_request import put_score, put_actor
-from parameters import COMMANDS_TEST
-from random import choice
+from backend.pond_request import (put_score, put_actor, put_batch, CoalescingPublisher,
+                                  shutdown as shutdown_api)
+from backend.publish_queue import PublishQueue
+from backend.RenderPool import RenderPool
+from backend.RenderCache import RenderCache
+from backend.LilypondServer import LilypondServer
+from backend.metrics import metrics
+from parameters import (COMMANDS_TEST, RENDER_DIRECTORY, RENDER_WORKERS, LILYPOND_COMMAND,
+                        LOOKAHEAD_MEASURES, VOLUME_BUCKETS, RENDER_CACHE_DIRECTORY,
+                        RENDER_CACHE_SIZE_MB, LILYPOND_SERVER, USE_BATCH, ACTOR_WINDOW_S,
+                        PUBLISH_SPOOL_PATH, ARCHIVE_WINDOW,
+                        PART_RENDER_INTERVAL, EVENT_LOG_DIRECTORY, METRICS_PATH,
+                        METRICS_EXPORT_INTERVAL, MEASURE_BUDGET_FRACTION)
+from collections import deque
+from random import choice, SystemRandom
 from os import path
+from time import perf_counter
 
 
 class PyPondWriter(QObject):
-    file_completed = pyqtSignal(int, tuple)
+    file_completed = pyqtSignal(int, tuple, str)
     stage_to_acting = '0ABCCD00'
 
-    def __init__(self, beat_duration, use_api=False, test=False, url="localhost"):
+    def __init__(self, beat_duration, use_api=False, test=False, url="localhost",
+                 lookahead=LOOKAHEAD_MEASURES, lilypond_server=LILYPOND_SERVER,
+                 use_batch=USE_BATCH):
         super().__init__()
         self.render = PondRender()
         self.pond_doc = PondDoc()
         self.main_document = MainDoc()
-        self.composer = MainComposer(path.join('backend', "data.json"))
+        seed = SystemRandom().getrandbits(62)
+        self.event_log = EventLog.new_performance(EVENT_LOG_DIRECTORY, seed)
+        self.performance_directory = path.splitext(self.event_log.file_path)[0]
+        self.composer = MainComposer(path.join('backend', "data.json"), seed,
+                                     archive_directory=self.performance_directory,
+                                     archive_window=ARCHIVE_WINDOW, write_through=True)
+        self.render_pool = RenderPool(self.pond_doc, RENDER_DIRECTORY, RENDER_WORKERS,
+                                      resolution=180, command=LILYPOND_COMMAND,
+                                      keep_files=lookahead + 6,
+                                      cache=RenderCache(RENDER_CACHE_DIRECTORY,
+                                                        RENDER_CACHE_SIZE_MB * 1024 * 1024),
+                                      server=self.create_server(lilypond_server))
+        self.lookahead = deque()
+        self.lookahead_size = max(1, lookahead)
+        self.lookahead_state = None
+        self.waiting_job = None
+        self.render_number = 0
+        self.part_documents = [PartDoc(name.capitalize())
+                               for name in self.composer.part_names]
+        self.part_jobs = {}
         self.advance_bar = False
         self.timer = QTimer(parent=self)
         self.measure_number = 0
@@ -27,6 +64,13 @@ class PyPondWriter(QObject):
         self.command = 'inerte'
         self.beat_duration = beat_duration
         self.use_api = use_api
+        self.use_batch = use_batch
+        self.publish_queue = PublishQueue(PUBLISH_SPOOL_PATH,
+                                          {'score': put_score,
+                                           'actor': put_actor,
+                                           'batch': put_batch},
+                                          path.basename(self.performance_directory))
+        self.actor_publisher = CoalescingPublisher(self.spool_actor, ACTOR_WINDOW_S)
         self.api_url = url
 
         self.init_doc()
@@ -38,8 +82,20 @@ class PyPondWriter(QObject):
         for name, function in LilypondScripts.commands_dict().items():
             self.pond_doc.add_function(name, function)
         self.timer.timeout.connect(self.render_image)
+        self.render_pool.job_completed.connect(self.measure_rendered)
+        self.render_pool.job_failed.connect(self.measure_failed)
+        self.render_pool.document_completed.connect(self.part_rendered)
         self.timer.setInterval(self.measure_duration(6))
 
+    @staticmethod
+    def create_server(use_server):
+        if not use_server:
+            return None
+        server = LilypondServer(RENDER_DIRECTORY, RENDER_WORKERS, resolution=180,
+                                command=LILYPOND_COMMAND)
+        server.warm_up()
+        return server
+
     @pyqtSlot()
     def begin(self):
         self.timer.start()
@@ -48,37 +104,152 @@ class PyPondWriter(QObject):
         return self.beat_duration * beat_number
 
     def render_image(self, render=True):
-        score, lines = self.composer.compose()
-        actor_data = self.get_actor_data()
+        if not render:
+            self.render_number += 1
+            with metrics.span('compose'):
+                measure = self.composer.compose_measure(self.render_number)
+            with metrics.span('commit'):
+                self.composer.commit(measure)
+            self.event_log.log_measure(measure)
+            self.measure_number += 1
+            if self.use_api:
+                with metrics.span('post_lines'):
+                    self.post_lines(measure.score, measure.lines)
+            self.update_parts()
+            return
+        self.refresh_lookahead()
+        measure, job = self.lookahead.popleft()
+        with metrics.span('commit', job.timings):
+            self.composer.commit(measure)
+        self.event_log.log_measure(measure)
         self.measure_number += 1
         if self.use_api:
-            self.post_lines(score, lines)
-        if render:
-            time = self.composer.current_time
-            self.timer.setInterval(self.measure_duration(time))
-            print(f"Rendering measure {self.measure_number}\n"
-                  f"    Volume: {self.composer.volume}\n"
-                  f"    Stage: {self.composer.stage}-{self.composer.direction}")
-            self.pond_doc.score = score
-            self.render.update(self.pond_doc.create_file())
-            self.render.write()
-            self.render.render()
-            self.file_completed.emit(time, actor_data)
+            with metrics.span('post_lines', job.timings):
+                self.post_lines(measure.score, measure.lines)
+        self.update_parts()
+        time = measure.duration
+        self.timer.setInterval(self.measure_duration(time))
+        print(f"Rendering measure {self.measure_number}\n"
+              f"    Volume: {self.composer.volume}\n"
+              f"    Stage: {self.composer.stage}-{self.composer.direction}\n"
+              f"    Render cache: {self.render_pool.cache.report()}\n"
+              f"    Actor updates: {self.actor_publisher.report()}\n"
+              f"    Unsent API updates: {len(self.publish_queue)}")
+        job.data = (time, self.get_actor_data())
+        self.fill_lookahead()
+        if job.failed():
+            self.measure_failed(job)
+            return
+        if job.done():
+            self.measure_rendered(job)
+        else:
+            self.waiting_job = job
+
+    def state_key(self):
+        volume_bucket = min(int(self.composer.volume * VOLUME_BUCKETS), VOLUME_BUCKETS - 1)
+        return self.composer.stage, self.composer.direction, volume_bucket
+
+    def refresh_lookahead(self):
+        state = self.state_key()
+        if state != self.lookahead_state:
+            for _, job in self.lookahead:
+                job.cancel()
+            self.lookahead.clear()
+            self.lookahead_state = state
+        self.fill_lookahead()
+
+    def fill_lookahead(self):
+        while len(self.lookahead) < self.lookahead_size:
+            self.render_number += 1
+            timings = {}
+            with metrics.span('compose', timings):
+                measure = self.composer.compose_measure(self.render_number)
+            job = self.render_pool.submit(measure.score, self.render_number, timings=timings)
+            self.lookahead.append((measure, job))
+
+    @pyqtSlot(object)
+    def measure_rendered(self, job):
+        if job.data is None:
+            return
+        if self.waiting_job is job:
+            self.waiting_job = None
+        time, actor_data = job.data
+        job.data = None
+        self.file_completed.emit(time, actor_data, job.image_path)
+        self.check_budget(job, time)
+
+    @pyqtSlot(object)
+    def measure_failed(self, job):
+        if job.data is None:
+            return
+        print(f"Measure {job.number} could not be rendered, skipping it")
+        job.data = None
+        if self.waiting_job is job:
+            self.waiting_job = None
+
+    def check_budget(self, job, time):
+        timings = dict(job.timings, update_label=metrics.last('update_label'))
+        budget = self.measure_duration(time) / 1000
+        metrics.check_budget(self.measure_number, timings, budget, MEASURE_BUDGET_FRACTION)
+        if self.measure_number % METRICS_EXPORT_INTERVAL == 0:
+            metrics.export(METRICS_PATH)
+
+    def update_parts(self, force=False):
+        if not force and self.measure_number % PART_RENDER_INTERVAL:
+            return
+        for idx, document in enumerate(self.part_documents):
+            name = self.composer.part_names[idx]
+            running = self.part_jobs.get(name)
+            if not force and running is not None and not running.done():
+                continue
+            score = PondScore.PondScore()
+            if force:
+                score.add_staff(self.composer.part_staff(self.composer.archive.part_path(idx)))
+                document.document.score = score
+                self.render_pool.submit_document(
+                    document.create_file(), path.join(self.performance_directory, name))
+                continue
+            part_path = self.composer.archive.part_path(idx)
+            draft_base = path.join(self.performance_directory, f"{name}_draft")
+            snapshot_path = path.abspath(draft_base + '_snapshot.ily')
+            score.add_staff(self.composer.part_staff(snapshot_path))
+            document.document.score = score
+            size = self.composer.archive.part_size(idx)
+            self.part_jobs[name] = self.render_pool.submit_document(
+                document.create_file(), draft_base,
+                prepare=lambda source=part_path, target=snapshot_path, length=size:
+                copy_prefix(source, target, length))
+
+    @pyqtSlot(object)
+    def part_rendered(self, job):
+        print(f"Part {job.number} exported to {job.image_path}")
 
     def post_lines(self, score, lines):
-        response = put_score(score.as_string(), 'score')
-        print("Score posted with status code", response.status_code)
+        if self.use_batch:
+            named_lines = [(instrument, str(line)) for line, instrument
+                           in zip(lines, ['Flute', 'Oboe', 'Clarinet'])]
+            self.publish_queue.enqueue('batch', self.measure_number, score.as_string(),
+                                       named_lines, self.composer.current_time,
+                                       self.measure_number, self.actor_state())
+            return
+        self.publish_queue.enqueue('score', self.measure_number, score.as_string(), 'score')
         zipped = zip(lines, ['Flute', 'Oboe', 'Clarinet'])
         for line, instrument in zipped:
-            response = put_score(str(line), instrument,
-                                 self.composer.current_time, self.measure_number)
-            print(f"{instrument} posted with status code", response.status_code)
+            self.publish_queue.enqueue('score', self.measure_number, str(line), instrument,
+                                       self.composer.current_time, self.measure_number)
         self.post_actor()
 
     def post_actor(self):
+        if not self.use_api:
+            return
+        self.actor_publisher.publish(*self.actor_state())
+
+    def spool_actor(self, *actor_state):
+        self.publish_queue.enqueue('actor', self.measure_number, *actor_state)
+
+    def actor_state(self):
         stage = f"{self.composer.stage}-{self.composer.direction}"
-        response = put_actor(self.command, stage, self.action_number)
-        print(f"Actor posted with status code", response.status_code)
+        return self.command, stage, self.action_number
 
     def get_actor_data(self) -> tuple:
         stage = self.composer.stage
@@ -91,40 +262,33 @@ class PyPondWriter(QObject):
 
     @pyqtSlot(dict)
     def update_values(self, values):
+        self.event_log.log_update(values)
         volume = values['VOLUME']
         self.composer.volume = volume
-        direction = values['DIRECTION']
-        self.composer.direction += direction
-        self.command = values['COMMAND']
-        self.action_number += 1
-        self.post_actor()
+        if 'COMMAND' in values:
+            direction = values['DIRECTION']
+            self.composer.direction += direction
+            self.command = values['COMMAND']
+            self.action_number += 1
+            self.post_actor()
 
     @pyqtSlot()
     def write_score(self):
         print("\nWriting Complete Score")
+        start = perf_counter()
         self.main_document.document.score = self.composer.render_complete_score()
         self.render.update(self.main_document.create_file())
         self.render.write()
+        print(f"{self.composer.archive.measure_count} measures written in "
+              f"{(perf_counter() - start) * 1000:.1f} ms")
+        self.update_parts(force=True)
+        metrics.export(METRICS_PATH)
 
-
-class MainDoc:
-    def __init__(self):
-        self.document = PondDoc()
-        self.custom_commands = LilypondScripts.commands_dict()
-        self.init_doc()
-
-    def init_doc(self):
-        header = PondHeader(title='"A Taste of Control"',
-                            composer='"Tom Bañados"')
-        paper = PondPaper()
-        paper.update_margins({"top-margin": 10,
-                              "left-margin": 15,
-                              "right-margin": 15})
-        paper.additional_data.append(LilypondScripts.paper_settings)
-        self.document.paper = paper
-        self.document.header = header
-        for name, function in self.custom_commands.items():
-            self.document.add_function(name, function)
-
-    def create_file(self):
-        return self.document.create_file()
+    @pyqtSlot()
+    def shutdown(self):
+        self.timer.stop()
+        self.render_pool.shutdown()
+        self.publish_queue.stop()
+        self.composer.close()
+        self.event_log.close()
+        shutdown_api()
@@ -0,0 +1,76 @@
+import hashlib
+import shutil
+from collections import OrderedDict
+from os import path, makedirs, remove, scandir
+from threading import Lock
+
+
+class RenderCache:
+    def __init__(self, directory, max_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        makedirs(directory, exist_ok=True)
+        self.load_entries()
+
+    def load_entries(self):
+        files = [entry for entry in scandir(self.directory)
+                 if entry.is_file() and entry.name.endswith('.png')]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files:
+            size = entry.stat().st_size
+            self.entries[entry.name[:-4]] = size
+            self.size += size
+        self.evict()
+
+    @staticmethod
+    def key(source):
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def image_path(self, key):
+        return path.join(self.directory, key + '.png')
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.image_path(key)
+
+    def count_hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def store(self, key, image_path):
+        cached_path = self.image_path(key)
+        shutil.copyfile(image_path, cached_path)
+        size = path.getsize(cached_path)
+        with self.lock:
+            self.size += size - self.entries.get(key, 0)
+            self.entries[key] = size
+            self.entries.move_to_end(key)
+            self.evict()
+        return cached_path
+
+    def evict(self):
+        while self.size > self.max_size and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                remove(self.image_path(key))
+            except OSError:
+                pass
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+    def report(self):
+        return (f"{self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate():.0%}), {self.size / 1024 / 1024:.1f} MB")
@@ -0,0 +1,206 @@
+import subprocess
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from os import path, makedirs, remove
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from backend.metrics import metrics
+
+
+def measure_span(phase, timings):
+    return nullcontext() if timings is None else metrics.span(phase, timings)
+
+
+def render_source(source, output_base, resolution=180, command='lilypond',
+                  formats=('png',), timings=None):
+    ly_path = output_base + '.ly'
+    with measure_span('write', timings):
+        with open(ly_path, 'w') as file:
+            file.write(source)
+    format_options = [f'--{output_format}' for output_format in formats]
+    with measure_span('render', timings):
+        subprocess.run([command, *format_options, f'-dresolution={resolution}',
+                        '-o', output_base, ly_path],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    return f'{output_base}.{formats[0]}'
+
+
+class RenderJob:
+    def __init__(self, number, source, output_base, data=None, key=None):
+        self.number = number
+        self.source = source
+        self.key = key
+        self.output_base = output_base
+        self.data = data
+        self.future = None
+        self.cancelled = False
+        self.timings = {}
+
+    @property
+    def image_path(self):
+        return self.future.result()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def failed(self):
+        return self.done() and self.future.exception() is not None
+
+    def cancel(self):
+        self.cancelled = True
+        self.future.cancel()
+
+
+class RenderPool(QObject):
+    job_completed = pyqtSignal(object)
+    job_failed = pyqtSignal(object)
+    job_finished = pyqtSignal(object)
+    document_completed = pyqtSignal(object)
+    document_finished = pyqtSignal(object)
+
+    def __init__(self, pond_doc, directory, workers=2, resolution=180,
+                 command='lilypond', keep_files=8, cache=None, server=None):
+        super().__init__()
+        self.pond_doc = pond_doc
+        self.directory = directory
+        self.resolution = resolution
+        self.command = command
+        self.keep_files = keep_files
+        self.cache = cache
+        self.server = server
+        self.in_flight = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='render')
+        self.document_executor = ThreadPoolExecutor(max_workers=1,
+                                                    thread_name_prefix='document')
+        self.pending = deque()
+        self.released = deque()
+        makedirs(directory, exist_ok=True)
+        self.job_finished.connect(self.release_jobs)
+        self.document_finished.connect(self.release_document)
+
+    def submit(self, score, number, data=None, timings=None):
+        timings = {} if timings is None else timings
+        self.pond_doc.score = score
+        with metrics.span('create_file', timings):
+            source = self.pond_doc.create_file()
+        job = self.submit_source(source, number, data)
+        job.timings.update(timings)
+        return job
+
+    def submit_source(self, source, number, data=None):
+        output_base = path.join(self.directory, f"measure_{number}")
+        key = self.cache.key(source) if self.cache else None
+        job = RenderJob(number, source, output_base, data, key)
+        running = self.in_flight.get(key)
+        if running is not None and not running.future.cancelled():
+            self.cache.count_hit()
+            job.future = Future()
+            running.future.add_done_callback(lambda done: self.follow(job, done))
+        else:
+            job.future = self.executor.submit(self.render_job, job)
+            if key is not None:
+                self.in_flight[key] = job
+                job.future.add_done_callback(lambda _: self.forget(job))
+        job.future.add_done_callback(lambda _: self.job_finished.emit(job))
+        self.pending.append(job)
+        return job
+
+    def follow(self, job, running_future):
+        if job.future.cancelled():
+            return
+        if running_future.cancelled():
+            render_future = self.executor.submit(self.render_job, job)
+            render_future.add_done_callback(lambda done: self.resolve(job.future, done))
+            return
+        self.resolve(job.future, running_future)
+
+    @staticmethod
+    def resolve(future, done):
+        if not future.set_running_or_notify_cancel():
+            return
+        exception = done.exception()
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(done.result())
+
+    def submit_document(self, source, output_base, formats=('pdf',), prepare=None):
+        job = RenderJob(path.basename(output_base), source, output_base)
+        job.future = self.document_executor.submit(self.render_document, job, formats,
+                                                   prepare)
+        job.future.add_done_callback(lambda _: self.document_finished.emit(job))
+        return job
+
+    def render_document(self, job, formats, prepare=None):
+        if prepare is not None:
+            prepare()
+        return render_source(job.source, job.output_base, self.resolution,
+                             self.command, formats)
+
+    @pyqtSlot(object)
+    def release_document(self, job):
+        if job.cancelled:
+            return
+        if job.failed():
+            print(f"Rendering {job.number} failed: {job.future.exception()}")
+            return
+        self.document_completed.emit(job)
+
+    def forget(self, job):
+        if self.in_flight.get(job.key) is job:
+            del self.in_flight[job.key]
+
+    def render_job(self, job):
+        if self.cache is not None:
+            cached_path = self.cache.get(job.key)
+            if cached_path is not None:
+                return cached_path
+        if self.server is not None:
+            with metrics.span('render', job.timings):
+                image_path = self.server.render(job.source, job.output_base)
+        else:
+            image_path = render_source(job.source, job.output_base,
+                                       self.resolution, self.command,
+                                       timings=job.timings)
+        if self.cache is not None:
+            return self.cache.store(job.key, image_path)
+        return image_path
+
+    @pyqtSlot(object)
+    def release_jobs(self, _job=None):
+        while self.pending and self.pending[0].done():
+            job = self.pending.popleft()
+            if job.cancelled:
+                self.remove_files(job)
+                continue
+            if job.failed():
+                print(f"Rendering measure {job.number} failed: {job.future.exception()}")
+                self.job_failed.emit(job)
+                continue
+            self.job_completed.emit(job)
+            self.discard_old_files(job)
+
+    def discard_old_files(self, job):
+        self.released.append(job)
+        if len(self.released) <= self.keep_files:
+            return
+        self.remove_files(self.released.popleft())
+
+    @staticmethod
+    def remove_files(job):
+        for extension in ('.ly', '.png'):
+            try:
+                remove(job.output_base + extension)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        for job in self.pending:
+            job.cancel()
+        self.executor.shutdown(wait=False)
+        self.document_executor.shutdown(wait=False)
+        if self.server is not None:
+            self.server.shutdown()
@@ -1,43 +1,99 @@
 from pypond.PondMusic import PondMelody
-import json
-from random import choice, shuffle
+import tempfile
+from os import path, makedirs
+from random import Random
 
 from .FragmentComposers import ComposerEmpty, ComposerA, ComposerB, ComposerC, ComposerD
 from pypond import PondScore
-from .pypond_extensions import PondInstrument, LilypondScripts
+from .pypond_extensions import PondInstrument, LilypondScripts, PitchTable
+from .ComposerConfig import ComposerConfig
+from .MeasureArchive import MeasureArchive
+
+
+class Measure:
+    def __init__(self, score, lines, time_signature, duration, index=None, state=None):
+        self.score = score
+        self.lines = lines
+        self.time_signature = time_signature
+        self.duration = duration
+        self.index = index
+        self.state = state
 
 
 class MainComposer:
-    def __init__(self, file_path):
-        with open(file_path, 'r') as file:
-            self.data = json.load(file)
+    part_names = ('flute', 'oboe', 'clarinet')
+
+    def __init__(self, file_path, seed=None, rng=None, archive_directory=None,
+                 archive_window=64, write_through=False):
+        self.config = ComposerConfig.load(file_path)
+        self.rng = rng or Random(seed)
+        self.seed_value = seed
         self.stage = 0
         self.__direction = 0
         self.__volume = 0.0
-        empty = ComposerEmpty()
+        empty = ComposerEmpty(rng=self.rng)
         self.instruments = {'flute': PondInstrument(0, 32, 5),
                             'oboe': PondInstrument(-1, 27, 3),
                             'clarinet': PondInstrument(-8, 24, 3, +2)}
+        self.pitch_tables = [PitchTable(stage.pitch_universe, self.instruments)
+                             for stage in self.config.stages]
         self.composers = {0: empty,
-                          1: ComposerA(instruments=self.instruments),
-                          2: ComposerB(instruments=self.instruments),
-                          3: ComposerC(instruments=self.instruments),
+                          1: ComposerA(instruments=self.instruments, rng=self.rng),
+                          2: ComposerB(instruments=self.instruments, rng=self.rng),
+                          3: ComposerC(instruments=self.instruments, rng=self.rng),
                           4: empty,
-                          5: ComposerD(instruments=self.instruments)}
-        self.all_instruments = [PondMelody() for _ in range(3)]
+                          5: ComposerD(instruments=self.instruments, rng=self.rng)}
+        self.temporary_directory = None
+        if archive_directory is None:
+            self.temporary_directory = tempfile.TemporaryDirectory(prefix='taste_archive_')
+            archive_directory = self.temporary_directory.name
+        self.archive = MeasureArchive(archive_directory, len(self.part_names), archive_window,
+                                      write_through)
         self.current_time = 6
 
-    def render_complete_score(self):
+    def close(self):
+        self.archive.close()
+        if self.temporary_directory is not None:
+            self.temporary_directory.cleanup()
+
+    def seed(self, value):
+        self.seed_value = value
+        self.rng.seed(value)
+
+    def seed_measure(self, index):
+        if self.seed_value is not None:
+            self.rng.seed(f"{self.seed_value}:{index}")
+
+    def state(self):
+        return self.stage, self.__direction, self.__volume
+
+    def set_state(self, stage, direction, volume):
+        self.stage = stage
+        self.__direction = direction
+        self.__volume = volume
+
+    def render_complete_score(self, parts_directory=None, relative_to=None):
+        if parts_directory:
+            makedirs(parts_directory, exist_ok=True)
         score = PondScore.PondScore()
-        for line in self.all_instruments:
-            staff = PondScore.PondStaff()
-            staff.time_signature = PondScore.PondTimeSignature(6, 4)
-            staff.top_level_text.extend(LilypondScripts.staff_marks)
-            staff.add_voice(line)
-            staff.add_with_command("omit", "TimeSignature")
-            score.add_staff(staff)
+        for idx, name in enumerate(self.part_names):
+            file_path = path.join(parts_directory, f"{name}.ily") if parts_directory else None
+            part_path = self.archive.part_path(idx, file_path)
+            if relative_to is not None:
+                part_path = path.relpath(part_path, relative_to)
+            score.add_staff(self.part_staff(part_path))
         return score
 
+    @staticmethod
+    def part_staff(part_path):
+        part_path = part_path.replace('\\', '/')
+        staff = PondScore.PondStaff()
+        staff.time_signature = PondScore.PondTimeSignature(6, 4)
+        staff.top_level_text.extend(LilypondScripts.staff_marks)
+        staff.top_level_text.append(f'\\include "{part_path}"')
+        staff.add_with_command("omit", "TimeSignature")
+        return staff
+
     @property
     def direction(self):
         return abs(int(self.__direction))
@@ -64,13 +120,21 @@ class MainComposer:
     def volume(self, value):
         self.__volume = value
 
-    def compose(self):
+    def compose(self, index=None):
+        measure = self.compose_measure(index)
+        self.commit(measure)
+        return measure.score, measure.lines
+
+    def compose_measure(self, index=None):
+        state = self.state()
+        if index is not None:
+            self.seed_measure(index)
         stage = self.stage if self.stage < 6 else 0
-        pitch_universe = self.get_composer_data(stage, "PITCH_UNIVERSE")
+        stage_config = self.config[stage]
+        pitch_universe = stage_config.pitch_universe
 
         score = PondScore.PondScore()
-        time_signature_initializers = self.get_composer_data(stage, "TIME_SIGNATURE")
-        time_signature = PondScore.PondTimeSignature(*time_signature_initializers)
+        time_signature = stage_config.pond_time_signature
         voice_data = self.get_voice_data(stage)
         composer = self.composers[stage]
         composer.set_dynamic(self.direction, self.volume)
@@ -78,10 +142,12 @@ class MainComposer:
         lines_by_instrument = composer.compose(pitch_universe,
                                                self.direction,
                                                self.volume,
-                                               voice_data)
-        target_duration = time_signature_initializers[0]
+                                               voice_data,
+                                               self.pitch_tables[stage])
+        target_duration = stage_config.duration
 
         for instrument, line in lines_by_instrument.items():
+            self.check_range(instrument, line)
             if instrument == 'clarinet':
                 self.instruments['clarinet'].transpose(line)
 
@@ -104,38 +170,48 @@ class MainComposer:
                 with open("ERROR_LOG", "at") as file:
                     file.write(error_string)
 
-            if self.current_time != target_duration:
-                melody = PondMelody(time_string=time_signature.as_string())
-                melody.append_fragment(line)
-            else:
-                melody = line
-            line_idx = lines.index(line)
-            self.all_instruments[line_idx].append_fragment(melody)
-
             staff = PondScore.PondStaff()
             staff.time_signature = time_signature
             staff.add_voice(line)
             staff.add_with_command("omit", "TimeSignature")
             score.add_staff(staff)
 
-        self.current_time = target_duration
-        return score, lines
+        return Measure(score, lines, time_signature, target_duration, index, state)
+
+    def check_range(self, instrument, line):
+        report = self.instruments[instrument].check_range(line)
+        if report.valid:
+            return
+        error_string = (f"Out of range for {instrument}: "
+                        f"{report.out_of_range} (position, pitch), "
+                        f"Stage/direction: {self.stage}/{self.direction}, "
+                        f"Volume: {self.volume}\n\n")
+        print(error_string)
+        with open("ERROR_LOG", "at") as file:
+            file.write(error_string)
+
+    def commit(self, measure):
+        melodies = []
+        for line in measure.lines:
+            if self.current_time != measure.duration:
+                melody = PondMelody(time_string=measure.time_signature.as_string())
+                melody.append_fragment(line)
+            else:
+                melody = line
+            melodies.append(melody)
+        self.archive.append(melodies)
+
+        self.current_time = measure.duration
 
     def get_voice_data(self, composer):
-        types = self.get_composer_data(composer, 'VOICE_TYPES')[str(self.direction)]
-        shuffle_silence = self.get_composer_data(composer, 'SHUFFLE_SILENCE')
-        voices = choice(types)
+        stage_config = self.config[composer]
+        voices = self.rng.choice(stage_config.voice_types[self.direction])
 
         all_silences = [[1, 2, 2], [1, 1, 2], [0, 1, 2],
                         [0, 1, 1], [0, 1, 1], [0, 0, 1], [0, 0, 1]]
         min_index = min(6, max(self.stage, self.direction))
         silence_possibles = all_silences[min_index:]
-        silences = choice(silence_possibles)
-        if shuffle_silence:
-            shuffle(silences)
+        silences = self.rng.choice(silence_possibles)
+        if stage_config.shuffle_silence:
+            self.rng.shuffle(silences)
         return list(zip(voices, silences))
-
-    def get_composer_data(self, composer, data_needed='all'):
-        if data_needed == 'all':
-            return self.data['COMPOSER_DATA'][str(composer)]
-        return self.data['COMPOSER_DATA'][str(composer)][data_needed]
@@ -0,0 +1,17 @@
+import gzip
+import json
+
+
+def encode_batch(score_string, lines, duration, measure_number, actor):
+    payload = {'score': score_string,
+               'instruments': dict(lines),
+               'duration': duration,
+               'measure': measure_number,
+               'actor': {'action': actor[0],
+                         'stage': actor[1],
+                         'number': actor[2]}}
+    return gzip.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_batch(body):
+    return json.loads(gzip.decompress(body).decode('utf-8'))
@@ -0,0 +1,105 @@
+import argparse
+import json
+import sys
+from itertools import chain, repeat
+from os import path
+from random import Random
+from time import perf_counter
+
+from backend.TasteComposer import MainComposer
+from backend.pypond_extensions import MainDoc
+
+DATA_PATH = path.join(path.dirname(__file__), 'data.json')
+
+
+def random_inputs(rng=None):
+    rng = rng or Random()
+    increase_direction = -1
+    while True:
+        direction = not increase_direction
+        increase_direction += 1
+        if increase_direction > 4:
+            increase_direction = 0
+        yield {'VOLUME': rng.uniform(0.05, 5),
+               'DIRECTION': int(direction)}
+
+
+def input_rng(seed=None):
+    return Random(None if seed is None else f"{seed}:inputs")
+
+
+def scripted_inputs(file_path):
+    with open(file_path, 'r') as file:
+        text = file.read().strip()
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class HeadlessComposer:
+    def __init__(self, data_path=DATA_PATH, seed=None, archive_directory=None):
+        self.composer = MainComposer(data_path, seed, archive_directory=archive_directory)
+        self.measure_number = 0
+
+    def update_values(self, values):
+        self.composer.volume = values.get('VOLUME', 0)
+        if 'DIRECTION' in values:
+            self.composer.direction += values.get('DIRECTION', 0)
+
+    def run(self, inputs, measures):
+        inputs = chain(inputs, repeat(None))
+        for _ in range(measures):
+            values = next(inputs)
+            if values is not None:
+                self.update_values(values)
+            score, lines = self.composer.compose()
+            self.measure_number += 1
+            yield self.measure_number, score.as_string()
+
+    def close(self):
+        self.composer.close()
+
+    def complete_score(self, parts_directory=None, relative_to=None):
+        document = MainDoc()
+        document.document.score = self.composer.render_complete_score(parts_directory,
+                                                                      relative_to)
+        return document.create_file()
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Compose measures without the GUI.")
+    parser.add_argument('-n', '--measures', type=int, default=100)
+    parser.add_argument('-i', '--inputs', help="JSON list or JSON lines of "
+                                               "{'VOLUME': float, 'DIRECTION': int}")
+    parser.add_argument('-o', '--output', help="file for the measures, stdout by default")
+    parser.add_argument('-s', '--score', help="write the complete score to this file")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--data', default=DATA_PATH)
+    args = parser.parse_args(arguments)
+
+    if args.inputs:
+        inputs = scripted_inputs(args.inputs)
+    else:
+        inputs = random_inputs(input_rng(args.seed))
+    headless = HeadlessComposer(args.data, args.seed)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    start = perf_counter()
+    try:
+        for measure_number, measure in headless.run(inputs, args.measures):
+            output.write(f"% Measure {measure_number}\n{measure}\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = perf_counter() - start
+    print(f"Composed {headless.measure_number} measures in {elapsed:.2f}s "
+          f"({headless.measure_number / max(elapsed, 1e-9):.0f} measures/s)",
+          file=sys.stderr)
+    if args.score:
+        with open(args.score, 'w') as file:
+            file.write(headless.complete_score(path.splitext(args.score)[0] + '_parts',
+                                               path.dirname(path.abspath(args.score))))
+    headless.close()
+
+
+if __name__ == "__main__":
+    main()
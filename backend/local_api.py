@@ -0,0 +1,112 @@
+import json
+import sys
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock
+from urllib.parse import urlparse, parse_qs
+
+from backend.batch_format import decode_batch
+
+
+class LocalApiState:
+    def __init__(self):
+        self.score = ''
+        self.instruments = {}
+        self.actor = {}
+        self.requests = 0
+        self.lock = Lock()
+
+    def put_score(self, score_string):
+        with self.lock:
+            self.score = score_string
+
+    def put_instrument(self, instrument, score_string, duration, measure):
+        with self.lock:
+            self.instruments[instrument] = {'score_data': score_string,
+                                            'duration': int(duration),
+                                            'measure': int(measure)}
+
+    def put_actor(self, action, stage, number):
+        with self.lock:
+            self.actor = {'action': action, 'stage': stage, 'number': int(number)}
+
+    def put_batch(self, payload):
+        self.put_score(payload['score'])
+        for instrument, line in payload['instruments'].items():
+            self.put_instrument(instrument, line, payload['duration'], payload['measure'])
+        actor = payload['actor']
+        self.put_actor(actor['action'], actor['stage'], actor['number'])
+
+
+class LocalApiHandler(BaseHTTPRequestHandler):
+    state = LocalApiState()
+    batch = True
+
+    def log_message(self, format_, *args):
+        pass
+
+    def endpoint(self):
+        return urlparse(self.path).path.strip('/')
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length)
+
+    def read_form(self):
+        form = parse_qs(self.read_body().decode('utf-8'))
+        return {key: value[0] for key, value in form.items()}
+
+    def respond(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        endpoint = self.endpoint()
+        self.state.requests += 1
+        if endpoint == '':
+            self.state.put_score(self.read_form()['score_data'])
+        elif endpoint == 'instrument':
+            form = self.read_form()
+            self.state.put_instrument(form['instrument'], form['score_data'],
+                                      form['duration'], form['measure'])
+        elif endpoint == 'actor':
+            form = self.read_form()
+            self.state.put_actor(form['action'], form['stage'], form['number'])
+        elif endpoint == 'batch' and self.batch:
+            self.state.put_batch(decode_batch(self.read_body()))
+        else:
+            self.respond({'error': 'not found'}, 404)
+            return
+        self.respond({'status': 'ok'})
+
+    def do_GET(self):
+        endpoint = self.endpoint()
+        params = {key: value[0] for key, value in parse_qs(urlparse(self.path).query).items()}
+        if endpoint == '':
+            self.respond({'score_data': self.state.score})
+        elif endpoint == 'instrument':
+            instrument = self.state.instruments.get(params.get('instrument'))
+            if instrument is None:
+                self.respond({'error': 'not found'}, 404)
+            else:
+                self.respond(instrument)
+        elif endpoint == 'actor':
+            self.respond(self.state.actor)
+        else:
+            self.respond({'error': 'not found'}, 404)
+
+
+def serve(port=8000, batch=True):
+    handler = type('LocalApiHandler', (LocalApiHandler,),
+                   {'state': LocalApiState(), 'batch': batch})
+    server = ThreadingHTTPServer(('localhost', port), handler)
+    print(f"Local API listening on http://localhost:{server.server_port}/")
+    return server
+
+
+if __name__ == "__main__":
+    port_number = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    serve(port_number, '--no-batch' not in sys.argv).serve_forever()
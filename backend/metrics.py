@@ -0,0 +1,82 @@
+import json
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter, strftime
+
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PhaseMetrics:
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.lock = Lock()
+
+    @contextmanager
+    def span(self, phase, timings=None):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.record(phase, elapsed)
+            if timings is not None:
+                timings[phase] = timings.get(phase, 0.) + elapsed
+
+    def record(self, phase, seconds):
+        with self.lock:
+            self.samples[phase].append(seconds)
+
+    def last(self, phase):
+        with self.lock:
+            samples = self.samples.get(phase)
+            return samples[-1] if samples else 0.
+
+    @staticmethod
+    def histogram(samples):
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for sample in samples:
+            milliseconds = sample * 1000
+            for idx, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if milliseconds <= bound:
+                    counts[idx] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def summary(self):
+        with self.lock:
+            phases = {phase: sorted(samples) for phase, samples in self.samples.items()}
+        result = {}
+        for phase, ordered in phases.items():
+            if not ordered:
+                continue
+            result[phase] = {'count': len(ordered),
+                             'p50_ms': ordered[len(ordered) // 2] * 1000,
+                             'p99_ms': ordered[min(len(ordered) - 1,
+                                                   int(len(ordered) * 0.99))] * 1000,
+                             'max_ms': ordered[-1] * 1000,
+                             'histogram': self.histogram(ordered)}
+        return result
+
+    def export(self, file_path):
+        data = {'date': strftime('%Y-%m-%d %H:%M:%S'),
+                'buckets_ms': HISTOGRAM_BUCKETS_MS,
+                'phases': self.summary()}
+        with open(file_path, 'w') as file:
+            json.dump(data, file, indent=2)
+
+    def check_budget(self, measure_number, timings, budget, fraction=0.8):
+        total = sum(timings.values())
+        self.record('total', total)
+        if total >= budget * fraction:
+            phases = ', '.join(f"{phase} {seconds * 1000:.0f} ms"
+                               for phase, seconds in timings.items())
+            print(f"WARNING: measure {measure_number} took {total:.2f}s of its "
+                  f"{budget:.2f}s ({phases})")
+        return total
+
+
+metrics = PhaseMetrics()
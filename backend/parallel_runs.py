@@ -0,0 +1,70 @@
+import argparse
+import sys
+from multiprocessing import Pool, cpu_count
+from os import path, makedirs
+from time import perf_counter
+
+from backend.headless import HeadlessComposer, random_inputs, input_rng, DATA_PATH
+
+
+def compose_run(run_data):
+    run_number, seed, data_path, output_type, max_measures, output_directory = run_data
+    headless = HeadlessComposer(data_path, seed)
+    inputs = random_inputs(input_rng(seed))
+    while headless.composer.stage < 6 and headless.measure_number < max_measures:
+        for _ in headless.run(inputs, 1):
+            pass
+    if output_type == 'score':
+        parts_directory = path.join(output_directory, f"run_{run_number:04d}_parts")
+        result = headless.complete_score(parts_directory, output_directory)
+    else:
+        archive = headless.composer.archive
+        result = '\n'.join(archive.part_string(idx) for idx in range(archive.parts))
+    headless.close()
+    return run_number, seed, headless.measure_number, result
+
+
+def run_parallel(runs, output_directory, base_seed=0, processes=None,
+                 output_type='score', data_path=DATA_PATH, max_measures=1000):
+    makedirs(output_directory, exist_ok=True)
+    run_data = [(run_number, base_seed + run_number, data_path, output_type, max_measures,
+                 output_directory)
+                for run_number in range(runs)]
+    with Pool(processes or cpu_count()) as pool:
+        for run_number, seed, measures, result in pool.imap_unordered(compose_run,
+                                                                      run_data):
+            file_path = path.join(output_directory, f"run_{run_number:04d}.ly")
+            with open(file_path, 'w') as file:
+                file.write(f"% Seed {seed}, {measures} measures\n")
+                file.write(result)
+            yield run_number, seed, measures
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Compose complete runs of the piece "
+                                                 "in parallel.")
+    parser.add_argument('-r', '--runs', type=int, default=100)
+    parser.add_argument('-o', '--output', default='runs')
+    parser.add_argument('-p', '--processes', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--melodies', action='store_true',
+                        help="write the three instrument lines instead of a full score")
+    parser.add_argument('--max-measures', type=int, default=1000)
+    parser.add_argument('--data', default=DATA_PATH)
+    args = parser.parse_args(arguments)
+
+    output_type = 'melodies' if args.melodies else 'score'
+    start = perf_counter()
+    total_measures = 0
+    for run_number, seed, measures in run_parallel(args.runs, args.output, args.seed,
+                                                   args.processes, output_type,
+                                                   args.data, args.max_measures):
+        total_measures += measures
+        print(f"Run {run_number} (seed {seed}): {measures} measures", file=sys.stderr)
+    elapsed = perf_counter() - start
+    print(f"{args.runs} runs, {total_measures} measures in {elapsed:.2f}s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,19 @@
+from threading import Condition, Thread
+from time import sleep
+
 import requests
+from requests.adapters import HTTPAdapter
 
+from backend.batch_format import encode_batch
 from private_parameters import url
+from parameters import API_TIMEOUT, API_POOL_SIZE
+
+session = requests.Session()
+session.headers['Connection'] = 'keep-alive'
+adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+session.mount('http://', adapter)
+session.mount('https://', adapter)
+batch_supported = True
 
 
 def put_score(score_string, score_type, duration=6, measure_number=0):
@@ -15,8 +28,8 @@ def put_score(score_string, score_type, duration=6, measure_number=0):
                 'measure': measure_number
                 }
     try:
-        response = requests.put(url + extension, data=data)
-    except requests.exceptions.ConnectionError as exception:
+        response = session.put(url + extension, data=data, timeout=API_TIMEOUT)
+    except requests.exceptions.RequestException as exception:
         print(exception)
         return
     return response
@@ -31,8 +44,8 @@ def get_score(score_type, measure_number):
         data = {'instrument': score_type,
                 'measure': measure_number}
     try:
-        response = requests.get(url + extension, params=data)
-    except requests.exceptions.ConnectionError as exception:
+        response = session.get(url + extension, params=data, timeout=API_TIMEOUT)
+    except requests.exceptions.RequestException as exception:
         print(exception)
         return
 
@@ -46,8 +59,8 @@ def put_actor(actor_string, stage, action_number):
     extension = 'actor'
 
     try:
-        response = requests.put(url + extension, data=data)
-    except requests.exceptions.ConnectionError as exception:
+        response = session.put(url + extension, data=data, timeout=API_TIMEOUT)
+    except requests.exceptions.RequestException as exception:
         print(exception)
         return
     return response
@@ -56,8 +69,81 @@ def put_actor(actor_string, stage, action_number):
 def get_actor():
     extension = 'actor'
     try:
-        response = requests.get(url + extension)
-    except requests.exceptions.ConnectionError as exception:
+        response = session.get(url + extension, timeout=API_TIMEOUT)
+    except requests.exceptions.RequestException as exception:
         print(exception)
         return
     return response
+
+
+def request_failed(response):
+    return response is None or response.status_code >= 400
+
+
+def put_batch(score_string, lines, duration, measure_number, actor):
+    global batch_supported
+    if batch_supported:
+        headers = {'Content-Type': 'application/json',
+                   'Content-Encoding': 'gzip'}
+        body = encode_batch(score_string, lines, duration, measure_number, actor)
+        try:
+            response = session.put(url + 'batch', data=body, headers=headers,
+                                   timeout=API_TIMEOUT)
+        except requests.exceptions.RequestException as exception:
+            print(exception)
+            return
+        if response.status_code not in (404, 405):
+            return response
+        print("API has no batch endpoint, posting separately")
+        batch_supported = False
+    response = put_score(score_string, 'score')
+    for instrument, line in lines:
+        if request_failed(response):
+            return response
+        response = put_score(line, instrument, duration, measure_number)
+    if request_failed(response):
+        return response
+    return put_actor(*actor)
+
+
+class CoalescingPublisher:
+    def __init__(self, send, window=1.):
+        self.send = send
+        self.window = window
+        self.latest = None
+        self.submitted = 0
+        self.merged = 0
+        self.sent = 0
+        self.condition = Condition()
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def publish(self, *args):
+        with self.condition:
+            self.submitted += 1
+            if self.latest is not None:
+                self.merged += 1
+            self.latest = args
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.latest is None:
+                    self.condition.wait()
+            sleep(self.window)
+            with self.condition:
+                args, self.latest = self.latest, None
+            try:
+                self.send(*args)
+            except Exception as exception:
+                print("Publishing update failed:", repr(exception))
+                continue
+            self.sent += 1
+
+    def report(self):
+        return f"{self.submitted} updates, {self.merged} merged, {self.sent} sent"
+
+
+def shutdown():
+    session.close()
@@ -0,0 +1,106 @@
+import heapq
+import json
+from os import path, makedirs
+from threading import Condition, Event, Thread
+
+
+class PublishQueue:
+    def __init__(self, spool_path, senders, performance='', base_delay=0.5, max_delay=30.):
+        self.spool_path = spool_path
+        self.senders = senders
+        self.performance = performance
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pending = []
+        self.next_id = 0
+        self.condition = Condition()
+        self.stopped = Event()
+        directory = path.dirname(spool_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+        self.load_spool()
+        self.spool = open(spool_path, 'a', encoding='utf-8')
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def load_spool(self):
+        if not path.exists(self.spool_path):
+            return
+        entries = {}
+        with open(self.spool_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'ack' in record:
+                    entries.pop(record['ack'], None)
+                else:
+                    entries[record['id']] = record
+                    self.next_id = max(self.next_id, record['id'] + 1)
+        for record in entries.values():
+            current = record.get('performance', '') == self.performance
+            heapq.heappush(self.pending, (current, record['measure'], record['id'],
+                                          record['kind'], record['args']))
+        if self.pending:
+            print(f"Replaying {len(self.pending)} unsent API updates")
+
+    def write_record(self, record):
+        if self.spool.closed:
+            return
+        self.spool.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self.spool.flush()
+
+    def enqueue(self, kind, measure, *args):
+        with self.condition:
+            entry_id = self.next_id
+            self.next_id += 1
+            self.write_record({'id': entry_id, 'performance': self.performance,
+                               'kind': kind, 'measure': measure, 'args': args})
+            heapq.heappush(self.pending, (True, measure, entry_id, kind, list(args)))
+            self.condition.notify()
+
+    def acknowledge(self, entry_id):
+        with self.condition:
+            self.pending = [entry for entry in self.pending if entry[2] != entry_id]
+            heapq.heapify(self.pending)
+            self.write_record({'ack': entry_id})
+            if not self.pending and not self.spool.closed:
+                self.spool.close()
+                self.spool = open(self.spool_path, 'w', encoding='utf-8')
+
+    def run(self):
+        delay = self.base_delay
+        while not self.stopped.is_set():
+            with self.condition:
+                while not self.pending and not self.stopped.is_set():
+                    self.condition.wait()
+                if self.stopped.is_set():
+                    return
+                _, measure, entry_id, kind, args = self.pending[0]
+            response = self.senders[kind](*args)
+            if response is None or response.status_code >= 500:
+                print(f"Posting {kind} for measure {measure} failed, "
+                      f"retrying in {delay:.1f}s")
+                self.stopped.wait(delay)
+                delay = min(delay * 2, self.max_delay)
+                continue
+            if response.status_code >= 400:
+                print(f"API rejected {kind} for measure {measure} "
+                      f"with status code", response.status_code)
+            else:
+                print(f"{kind.capitalize()} for measure {measure} posted "
+                      f"with status code", response.status_code)
+            self.acknowledge(entry_id)
+            delay = self.base_delay
+
+    def __len__(self):
+        return len(self.pending)
+
+    def stop(self, timeout=10.):
+        self.stopped.set()
+        with self.condition:
+            self.condition.notify()
+        self.thread.join(timeout)
+        with self.condition:
+            self.spool.close()
@@ -1,4 +1,8 @@
+from typing import NamedTuple, Optional
+
 from pypond.PondMusic import PondNote
+from pypond.PondFile import PondDoc
+from pypond.PondCommand import PondHeader, PondPaper
 
 
 class LilypondScripts:
@@ -70,6 +74,16 @@ class LilypondScripts:
                 cls.gliss_off[0]: cls.gliss_off[1]}
 
 
+class RangeReport(NamedTuple):
+    lowest: Optional[int]
+    highest: Optional[int]
+    out_of_range: list
+
+    @property
+    def valid(self):
+        return not self.out_of_range
+
+
 class PondInstrument:
     def __init__(self, lower_range, higher_range,
                  increased_range=0, transposition=0):
@@ -78,14 +92,35 @@ class PondInstrument:
         self.transposition = transposition
 
     def validate_melody(self, melody):
-        if min(melody.ordered_notes(), key=lambda x: x.absolute_int) < self.range[0]:
+        report = self.check_range(melody)
+        if report.lowest is None:
+            return True, "normal"
+        if report.lowest < self.range[0]:
             return False, "lower"
-        elif max(melody.ordered_notes(), key=lambda x: x.absolute_int) > self.range[2]:
+        elif report.highest > self.range[2]:
             return False, "higher"
-        elif max(melody.ordered_notes(), key=lambda x: x.absolute_int) > self.range[1]:
+        elif report.highest > self.range[1]:
             return True, "increased"
         return True, "normal"
 
+    def check_range(self, melody):
+        lower, higher = self.range[0], self.range[2]
+        lowest = highest = None
+        out_of_range = []
+        for position, note in enumerate(melody.ordered_notes()):
+            if note.is_rest():
+                continue
+            pitch = note.absolute_int
+            if lowest is None:
+                lowest = highest = pitch
+            elif pitch < lowest:
+                lowest = pitch
+            elif pitch > highest:
+                highest = pitch
+            if pitch < lower or pitch > higher:
+                out_of_range.append((position, pitch))
+        return RangeReport(lowest, highest, out_of_range)
+
     def limit_pitch_universe(self, pitch_universe: list):
         allowed_pitches = range(self.range[0], self.range[2] + 1)
         universe = []
@@ -96,3 +131,49 @@ class PondInstrument:
 
     def transpose(self, melody):
         melody.transpose(self.transposition)
+
+
+class PitchTable:
+    def __init__(self, pitch_universe, instruments):
+        self.universe = tuple(pitch_universe)
+        self.index = {pitch: idx for idx, pitch in enumerate(self.universe)}
+        self.instruments = {}
+        shared = self.universe
+        for name, instrument in instruments.items():
+            self.instruments[name] = tuple(instrument.limit_pitch_universe(self.universe))
+            shared = tuple(instrument.limit_pitch_universe(shared))
+        self.shared = shared
+
+
+class MainDoc:
+    def __init__(self):
+        self.document = PondDoc()
+        self.custom_commands = LilypondScripts.commands_dict()
+        self.init_doc()
+
+    def init_doc(self):
+        header = PondHeader(title='"A Taste of Control"',
+                            composer='"Tom Bañados"')
+        paper = PondPaper()
+        paper.update_margins({"top-margin": 10,
+                              "left-margin": 15,
+                              "right-margin": 15})
+        paper.additional_data.append(LilypondScripts.paper_settings)
+        self.document.paper = paper
+        self.document.header = header
+        for name, function in self.custom_commands.items():
+            self.document.add_function(name, function)
+
+    def create_file(self):
+        return self.document.create_file()
+
+
+class PartDoc(MainDoc):
+    def __init__(self, instrument):
+        self.instrument = instrument
+        super().__init__()
+
+    def init_doc(self):
+        super().init_doc()
+        self.document.header = PondHeader(title=f'"A Taste of Control - {self.instrument}"',
+                                          composer='"Tom Bañados"')
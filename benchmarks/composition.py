@@ -0,0 +1,139 @@
+import argparse
+import json
+import platform
+import subprocess
+import tracemalloc
+from os import path
+from time import perf_counter_ns, strftime
+
+from pypond.PondCore import DurationInterface
+
+from backend.TasteComposer import MainComposer
+from backend.headless import DATA_PATH
+
+VOLUME_BUCKETS = (0.1, 0.5, 0.9)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def traced_blocks():
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+def measure(function, iterations):
+    times = []
+    for _ in range(iterations):
+        start = perf_counter_ns()
+        function()
+        times.append(perf_counter_ns() - start)
+
+    peaks = []
+    blocks = []
+    for _ in range(min(iterations, 20)):
+        tracemalloc.start()
+        result = function()
+        blocks.append(len(traced_blocks().traces))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del result
+
+    return {'iterations': iterations,
+            'p50_us': percentile(times, 0.5) / 1000,
+            'p99_us': percentile(times, 0.99) / 1000,
+            'mean_us': sum(times) / len(times) / 1000,
+            'allocated_blocks': sum(blocks) / len(blocks),
+            'peak_kib': sum(peaks) / len(peaks) / 1024}
+
+
+def composition_cases(composer):
+    for stage, stage_config in enumerate(composer.config.stages):
+        for direction in range(len(stage_config.voice_types)):
+            for volume in VOLUME_BUCKETS:
+                yield stage, direction, volume
+
+
+def bench_composition(iterations, seed=0, data_path=DATA_PATH):
+    composer = MainComposer(data_path, seed)
+    results = {}
+    for stage, direction, volume in composition_cases(composer):
+        def compose():
+            composer.set_state(stage, direction, volume)
+            return composer.compose_measure()
+        results[f"{stage}-{direction}-{volume}"] = measure(compose, iterations)
+    composer.close()
+    return results
+
+
+def bench_helpers(iterations, seed=0, data_path=DATA_PATH):
+    composer = MainComposer(data_path, seed)
+    base = composer.composers[1]
+    pitch_universe = base.get_voice_pitch_universe(composer.config[1].pitch_universe,
+                                                   'flute')
+    cases = {'build_index_route': lambda: base.build_index_route(25, len(pitch_universe)),
+             'build_index_route_target': lambda: base.build_index_route(
+                 25, len(pitch_universe), len(pitch_universe) - 2),
+             'compose_repeated': lambda: base.compose_repeated(10, 2, 0.25),
+             'compose_repeated_tuplet': lambda: base.compose_repeated(10, 2, 1 / 3),
+             'compose_trill_fragment': lambda: base.compose_trill_fragment(
+                 pitch_universe, duration=4, volume=0.5),
+             'compose_melodic_fragment': lambda: base.compose_melodic_fragment(
+                 pitch_universe, duration=4, tuplet_type='5', volume=0.5),
+             'get_duration_list': lambda: DurationInterface.get_duration_list(3.75, True)}
+    results = {name: measure(function, iterations) for name, function in cases.items()}
+    composer.close()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results, previous):
+    for group in ('composition', 'helpers'):
+        for name, result in results[group].items():
+            old = previous.get(group, {}).get(name, {})
+            if 'p50_us' in result and 'p50_us' in old:
+                ratio = result['p50_us'] / old['p50_us']
+                print(f"{group:12} {name:28} p50 {old['p50_us']:9.1f} -> "
+                      f"{result['p50_us']:9.1f} us ({ratio:.2f}x)")
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Time MainComposer and its helpers.")
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('-o', '--output', default='bench_composition.json')
+    parser.add_argument('-c', '--compare', help="previous results to compare against")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(arguments)
+
+    results = {'commit': git_commit(),
+               'date': strftime('%Y-%m-%d %H:%M:%S'),
+               'python': platform.python_version(),
+               'iterations': args.iterations,
+               'composition': bench_composition(args.iterations, args.seed),
+               'helpers': bench_helpers(args.iterations, args.seed)}
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    for group in ('composition', 'helpers'):
+        for name, result in results[group].items():
+            print(f"{group:12} {name:28} p50 {result['p50_us']:9.1f} us  "
+                  f"p99 {result['p99_us']:9.1f} us  "
+                  f"{result['allocated_blocks']:7.0f} blocks  "
+                  f"peak {result['peak_kib']:8.1f} KiB")
+    if args.compare and path.exists(args.compare):
+        with open(args.compare, 'r') as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
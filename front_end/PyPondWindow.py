@@ -7,6 +7,7 @@ from PyQt5.QtWidgets import (QWidget, QPushButton, QHBoxLayout, QVBoxLayout, QSi
 from PyQt5.QtGui import QFont
 
 from front_end.QPondWidgets import ScoreLabel, Metronome
+from backend.metrics import metrics
 from parameters import SCORE_IMAGE_PATH, WINDOW_GEOMETRY
 from time import sleep
 
@@ -126,8 +127,8 @@ class PyPondWindow(QWidget):
         else:
             self.metronome.hide()
 
-    @pyqtSlot(int, tuple)
-    def update_label(self, measure_time, acting_data):
+    @pyqtSlot(int, tuple, str)
+    def update_label(self, measure_time, acting_data, image_path=''):
         if self.grid_based:
             idx_hide = self.hide_label_idx()
             label_hide = self.music_labels[idx_hide]
@@ -138,8 +139,9 @@ class PyPondWindow(QWidget):
         self.acting.setText(action)
         idx_update = self.next_label()
         label_update = self.music_labels[idx_update]
-        image_path = self.image_path
-        label_update.update_label(image_path)
+        image_path = image_path or self.image_path
+        with metrics.span('update_label'):
+            label_update.update_label(image_path)
         self.metronome.new_measure(measure_time)
         if not self.hide_score_label:
             label_update.show()
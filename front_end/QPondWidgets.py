@@ -1,7 +1,6 @@
 from PyQt5.QtWidgets import QLabel, QWidget, QPushButton, QHBoxLayout, QVBoxLayout, QSizePolicy
 from PyQt5.QtGui import QPixmap, QColor, QPainter, QFont
-from PyQt5.QtCore import QTimer, QThread, pyqtSlot
-from time import sleep
+from PyQt5.QtCore import QTimer, QPropertyAnimation, pyqtProperty, pyqtSlot
 
 
 class ScoreLabel(QWidget):
@@ -64,7 +63,6 @@ class Metronome(QLabel):
         self.setLayout(vbox)
 
         self.timer.start()
-        self.beeper.start()
         self.countdown.hide()
 
     def beat(self):
@@ -82,14 +80,18 @@ class Metronome(QLabel):
 
 
 class Beeper(QLabel):
+    fade_duration_ms = 520
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._alpha = 255
-        self.thread = BeeperThread(self)
+        self._alpha = 0
+        self.fade = QPropertyAnimation(self, b"alpha", self)
+        self.fade.setStartValue(255)
+        self.fade.setEndValue(0)
+        self.fade.setDuration(self.fade_duration_ms)
         self.setMinimumSize(50, 50)
 
-    @property
+    @pyqtProperty(int)
     def alpha(self):
         return self._alpha
 
@@ -106,19 +108,5 @@ class Beeper(QLabel):
         painter.end()
 
     def beep(self):
-        self.alpha = 255
-
-    def start(self):
-        self.thread.start()
-
-
-class BeeperThread(QThread):
-    def __init__(self, beeper, *args, **kwargs):
-        super().__init__()
-        self.beeper = beeper
-
-    def run(self):
-        while True:
-            self.beeper.alpha -= 20
-            sleep(0.04)
-
+        self.fade.stop()
+        self.fade.start()
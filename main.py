@@ -19,7 +19,7 @@ if __name__ == "__main__":
 
     window = PyPondWindow(p.BEAT_DURATION_MS, image_path)
     render = PyPondWriter(p.BEAT_DURATION_MS, p.USE_API, p.TEST_COMMANDS, url)
-    bot_messenger = Messenger(p.COMMANDS, channel_name)
+    bot_messenger = Messenger(p.COMMANDS, channel_name, p.COMMAND_TICK_S, p.COMMANDS_TEST)
 
     window.signal_get_next.connect(render.render_image)
     window.signal_write_score.connect(render.write_score)
@@ -28,6 +28,7 @@ if __name__ == "__main__":
     bot_messenger.signal_start.connect(render.begin)
     bot_messenger.signal_start.connect(window.start)
     render.file_completed.connect(window.update_label)
+    app.aboutToQuit.connect(render.shutdown)
 
     bot_messenger.start()
     window.show()
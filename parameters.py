@@ -1,12 +1,32 @@
 SCORE_IMAGE_PATH = ["ly_files", "ly_files.png"]
 WINDOW_GEOMETRY = (200, 100, 1700, 900)
 BEAT_DURATION_MS = 1000
+RENDER_DIRECTORY = SCORE_IMAGE_PATH[0]
+RENDER_WORKERS = 2
+LILYPOND_COMMAND = "lilypond"
+LOOKAHEAD_MEASURES = 2
+ARCHIVE_WINDOW = 64
+PART_RENDER_INTERVAL = 8
+EVENT_LOG_DIRECTORY = "ly_files/performances"
+VOLUME_BUCKETS = 4
+METRICS_PATH = "ly_files/metrics.json"
+METRICS_EXPORT_INTERVAL = 16
+MEASURE_BUDGET_FRACTION = 0.8
+RENDER_CACHE_DIRECTORY = "ly_files/cache"
+RENDER_CACHE_SIZE_MB = 64
+LILYPOND_SERVER = True
 COMMANDS = ['sentarse', 'leer', 'nadar', 'bailar', 'asentir', 'negar', 'saltar',
             'esconderse', 'tocar_instrumento', 'levantar_brazo', 'bajar_brazo',
             'remar', 'gritar', 'caminar', 'pensar', 'mover_derecha', 'mover_izquierda',
             'abrazar', 'estirar', 'girar', 'imitar_animal', 'reir', 'señalar', 'revolver']
 USE_API = True
+API_TIMEOUT = (2, 5)
+API_POOL_SIZE = 4
+USE_BATCH = True
+PUBLISH_SPOOL_PATH = "ly_files/publish_spool.jsonl"
 TEST_COMMANDS = True
+COMMAND_TICK_S = 0.5
+ACTOR_WINDOW_S = 2 * COMMAND_TICK_S
 
 COMMANDS_TEST = ["Sentarse", "Leer", "Nadar", "Bailar", "Asentir", "Negar", "Saltar",
                  "Esconderse", "Tocar Instrumento", "Levantar Brazo", "Bajar Brazo",
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+pytest.importorskip('pypond')
+
+from backend.ComposerConfig import ComposerConfig
+
+
+def stage_data(**changes):
+    stage = {'PITCH_UNIVERSE': [0, 2, 4, 5, 7],
+             'VOICE_TYPES': {str(direction): [[1, 0, 0]] for direction in range(6)},
+             'SHUFFLE_SILENCE': False,
+             'TIME_SIGNATURE': [6, 4]}
+    stage.update(changes)
+    return stage
+
+
+def load(tmp_path, stage):
+    file_path = tmp_path / 'data.json'
+    file_path.write_text(json.dumps({'COMPOSER_DATA': {'0': stage}}))
+    return ComposerConfig.load(str(file_path))
+
+
+def test_loads_a_valid_stage(tmp_path):
+    config = load(tmp_path, stage_data())
+    assert config[0].pitch_universe == (0, 2, 4, 5, 7)
+    assert config[0].duration == 6
+
+
+@pytest.mark.parametrize('changes', [{'PITCH_UNIVERSE': []},
+                                     {'PITCH_UNIVERSE': 7},
+                                     {'PITCH_UNIVERSE': [4, 2]},
+                                     {'VOICE_TYPES': [[1, 0, 0]]},
+                                     {'VOICE_TYPES': {'0': [[1, 0]]}},
+                                     {'TIME_SIGNATURE': 6},
+                                     {'TIME_SIGNATURE': [6, 0]}])
+def test_rejects_malformed_stages(tmp_path, changes):
+    with pytest.raises(ValueError):
+        load(tmp_path, stage_data(**changes))
+
+
+def test_rejects_a_stage_that_is_not_an_object(tmp_path):
+    with pytest.raises(ValueError):
+        load(tmp_path, [])
@@ -0,0 +1,49 @@
+from random import Random
+
+import pytest
+
+pytest.importorskip('pypond')
+
+from backend.TasteComposer import MainComposer
+from backend.headless import DATA_PATH, HeadlessComposer, random_inputs, input_rng
+
+
+def compose_run(seed, measures, parts_directory):
+    headless = HeadlessComposer(seed=seed)
+    output = list(headless.run(random_inputs(input_rng(seed)), measures))
+    score = headless.complete_score(str(parts_directory), str(parts_directory))
+    headless.close()
+    parts = {part.name: part.read_bytes() for part in parts_directory.iterdir()}
+    return output, score, parts
+
+
+@pytest.fixture(autouse=True)
+def error_log_in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_same_seed_and_inputs_give_identical_lilypond(tmp_path):
+    first = compose_run(5, 60, tmp_path / 'first')
+    second = compose_run(5, 60, tmp_path / 'second')
+    assert first == second
+
+
+def test_different_seeds_give_different_measures(tmp_path):
+    first, _, _ = compose_run(5, 30, tmp_path / 'first')
+    second, _, _ = compose_run(6, 30, tmp_path / 'second')
+    assert first != second
+
+
+def test_discarded_measures_do_not_change_later_ones():
+    composer = MainComposer(DATA_PATH, 11)
+    composer.set_state(2, 3, 0.5)
+    expected = composer.compose_measure(4).score.as_string()
+    composer.compose_measure(5)
+    composer.compose_measure(6)
+    composer.set_state(2, 3, 0.5)
+    assert composer.compose_measure(4).score.as_string() == expected
+    composer.close()
+
+
+def test_inputs_do_not_share_the_composer_random_stream():
+    assert input_rng(3).random() != Random(3).random()
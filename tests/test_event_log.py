@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip('pypond')
+
+from backend.EventLog import EventLog, read_events, replay
+from backend.TasteComposer import MainComposer, Measure
+from backend.headless import DATA_PATH, random_inputs, input_rng
+
+
+def test_round_trip(tmp_path):
+    log = EventLog(str(tmp_path / 'run.tlog'), 1234)
+    log.log_update({'VOLUME': 0.5, 'DIRECTION': 1, 'COMMAND': 'leer'})
+    log.log_update({'VOLUME': 0.25})
+    log.log_measure(Measure(None, [], None, 6, index=3, state=(2, 1, 0.5)))
+    log.close()
+    events = list(read_events(log.file_path))
+    assert [event for event, _ in events] == ['seed', 'update', 'update', 'measure']
+    assert events[0][1] == 1234
+    assert events[1][1][1:] == (0.5, 1, 'leer')
+    assert events[2][1][1:] == (0.25, 0, '')
+    assert events[3][1][1:] == (3, 2, 1, 0.5)
+
+
+def test_truncated_record_ends_the_log(tmp_path):
+    log = EventLog(str(tmp_path / 'run.tlog'), 1)
+    log.log_update({'VOLUME': 0.5, 'DIRECTION': 0, 'COMMAND': 'leer'})
+    log.close()
+    with open(log.file_path, 'ab') as file:
+        file.write(b'\x02\x00\x01')
+    assert [event for event, _ in read_events(log.file_path)] == ['seed', 'update']
+
+
+def test_rejects_other_files(tmp_path):
+    file_path = tmp_path / 'other.tlog'
+    file_path.write_bytes(b'not an event log at all')
+    with pytest.raises(ValueError):
+        list(read_events(str(file_path)))
+
+
+def perform(directory, seed, measures):
+    composer = MainComposer(DATA_PATH, seed, archive_directory=str(directory / 'live'))
+    log = EventLog(str(directory / 'live.tlog'), seed)
+    inputs = random_inputs(input_rng(seed))
+    for index in range(1, measures + 1):
+        values = dict(next(inputs), COMMAND='leer')
+        log.log_update(values)
+        composer.volume = values['VOLUME']
+        composer.direction += values['DIRECTION']
+        measure = composer.compose_measure(index)
+        composer.commit(measure)
+        log.log_measure(measure)
+    log.close()
+    return composer, log.file_path
+
+
+def test_replay_reproduces_the_performance(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    composer, log_path = perform(tmp_path, 99, 40)
+    headless, updates = replay(log_path)
+    assert updates == 40
+    assert headless.measure_number == 40
+    for idx in range(len(composer.part_names)):
+        assert headless.composer.archive.part_string(idx) == \
+            composer.archive.part_string(idx)
+    headless.close()
+    composer.close()
@@ -0,0 +1,100 @@
+import json
+import sys
+import types
+from threading import Thread
+from urllib.request import Request, urlopen
+
+import pytest
+
+from backend.batch_format import encode_batch, decode_batch
+from backend.local_api import serve
+
+
+def start_server(batch=True):
+    server = serve(0, batch)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://localhost:{server.server_port}/"
+
+
+@pytest.fixture
+def api():
+    server, url = start_server()
+    yield server.RequestHandlerClass.state, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api_without_batch():
+    server, url = start_server(batch=False)
+    yield server.RequestHandlerClass.state, url
+    server.shutdown()
+    server.server_close()
+
+
+def put(url, body, headers=None):
+    request = Request(url, data=body, method='PUT', headers=headers or {})
+    with urlopen(request) as response:
+        return response.status
+
+
+def get(url):
+    with urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def test_batch_round_trip():
+    body = encode_batch('{ c }', [('Flute', 'c4')], 6, 3, ('Saltar', '1-2', 4))
+    assert decode_batch(body) == {'score': '{ c }', 'instruments': {'Flute': 'c4'},
+                                  'duration': 6, 'measure': 3,
+                                  'actor': {'action': 'Saltar', 'stage': '1-2',
+                                            'number': 4}}
+
+
+def test_batch_updates_every_endpoint(api):
+    state, url = api
+    body = encode_batch('{ c }', [('Flute', 'c4'), ('Oboe', 'd4')], 6, 3,
+                        ('Saltar', '1-2', 4))
+    assert put(url + 'batch', body, {'Content-Encoding': 'gzip'}) == 200
+    assert get(url)['score_data'] == '{ c }'
+    assert get(url + 'instrument?instrument=Oboe') == {'score_data': 'd4', 'duration': 6,
+                                                       'measure': 3}
+    assert get(url + 'actor') == {'action': 'Saltar', 'stage': '1-2', 'number': 4}
+    assert state.requests == 1
+
+
+@pytest.fixture
+def pond_request(monkeypatch):
+    pytest.importorskip('requests')
+    if 'private_parameters' not in sys.modules:
+        try:
+            import private_parameters
+        except ImportError:
+            monkeypatch.setitem(sys.modules, 'private_parameters',
+                                types.SimpleNamespace(url='http://localhost/'))
+    from backend import pond_request
+    monkeypatch.setattr(pond_request, 'batch_supported', True)
+    return pond_request
+
+
+def test_put_batch_posts_one_request(api, pond_request, monkeypatch):
+    state, url = api
+    monkeypatch.setattr(pond_request, 'url', url)
+    response = pond_request.put_batch('{ c }', [('Flute', 'c4')], 6, 1, ('Leer', '0', 1))
+    assert response.status_code == 200
+    assert state.requests == 1
+    assert pond_request.batch_supported
+
+
+def test_put_batch_falls_back_to_separate_requests(api_without_batch, pond_request,
+                                                   monkeypatch):
+    state, url = api_without_batch
+    monkeypatch.setattr(pond_request, 'url', url)
+    lines = [('Flute', 'c4'), ('Oboe', 'd4'), ('Clarinet', 'e4')]
+    response = pond_request.put_batch('{ c }', lines, 6, 2, ('Leer', '0', 1))
+    assert response.status_code == 200
+    assert not pond_request.batch_supported
+    assert state.score == '{ c }'
+    assert set(state.instruments) == {'Flute', 'Oboe', 'Clarinet'}
+    assert state.actor['action'] == 'Leer'
+    assert state.requests == 1 + 1 + len(lines) + 1
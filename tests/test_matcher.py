@@ -0,0 +1,33 @@
+from twitch_bot.matcher import CommandMatcher, normalize
+
+COMMANDS = ['sentarse', 'levantar_brazo', 'mirar_al_frente']
+ALIASES = ['Sentarse', 'Levantar Brazo', 'Mirar al Frente']
+
+
+def test_normalize_folds_case_accents_and_spacing():
+    assert normalize('  Levantar   Brazo ') == 'levantar_brazo'
+    assert normalize('Ésconderse') == 'esconderse'
+    assert normalize('mirar_al FRENTE') == 'mirar_al_frente'
+
+
+def test_matches_exact_prefixed_and_aliased_commands():
+    matcher = CommandMatcher(COMMANDS, ALIASES)
+    assert matcher.match('sentarse') == 'sentarse'
+    assert matcher.match('!Sentarse') == 'sentarse'
+    assert matcher.match('  !LEVANTAR brazo ') == 'levantar_brazo'
+    assert matcher.match('Mirar al Frente') == 'mirar_al_frente'
+
+
+def test_rejects_other_messages():
+    matcher = CommandMatcher(COMMANDS, ALIASES)
+    assert matcher.match('hola a todos') is None
+    assert matcher.match('!sentarse' + ' ' * 200 + 'x') is None
+    assert 'sentarse ahora' not in matcher
+
+
+def test_counts_hits_per_command():
+    matcher = CommandMatcher(COMMANDS, ALIASES)
+    for content in ('sentarse', '!sentarse', 'Levantar Brazo', 'nada'):
+        matcher.match(content)
+    assert matcher.hits == {'sentarse': 2, 'levantar_brazo': 1}
+    assert matcher.report() == 'sentarse: 2, levantar_brazo: 1'
@@ -0,0 +1,46 @@
+from backend.MeasureArchive import MeasureArchive, copy_prefix
+
+
+def measures(count):
+    return [(f"f{idx}", f"o{idx}", f"c{idx}") for idx in range(count)]
+
+
+def test_spills_measures_past_the_window(tmp_path):
+    archive = MeasureArchive(str(tmp_path), window=2)
+    for melodies in measures(5):
+        archive.append(melodies)
+    assert len(archive) == 5
+    assert archive.spilled_count == 3
+    assert archive.recent_melodies(1) == ['o3', 'o4']
+    assert archive.part_string(0) == ''.join(f"f{idx}\n" for idx in range(5))
+    archive.close()
+
+
+def test_write_through_keeps_every_measure_on_disk(tmp_path):
+    archive = MeasureArchive(str(tmp_path), window=2, write_through=True)
+    for melodies in measures(4):
+        archive.append(melodies)
+    assert archive.part_size(2) == len(''.join(f"c{idx}\n" for idx in range(4)))
+    with open(archive.part_path(2)) as file:
+        assert file.read() == ''.join(f"c{idx}\n" for idx in range(4))
+    assert archive.recent_melodies(0) == ['f2', 'f3']
+    archive.close()
+
+
+def test_write_part(tmp_path):
+    archive = MeasureArchive(str(tmp_path / 'archive'), window=1)
+    for melodies in measures(3):
+        archive.append(melodies)
+    part_path = archive.part_path(1, str(tmp_path / 'oboe.ily'))
+    with open(part_path) as file:
+        assert file.read() == 'o0\no1\no2\n'
+    archive.close()
+
+
+def test_copy_prefix(tmp_path):
+    source = tmp_path / 'source.ily'
+    source.write_text('0123456789')
+    copy_prefix(str(source), str(tmp_path / 'prefix.ily'), 4, block_size=3)
+    assert (tmp_path / 'prefix.ily').read_text() == '0123'
+    copy_prefix(str(source), str(tmp_path / 'whole.ily'))
+    assert (tmp_path / 'whole.ily').read_text() == '0123456789'
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from twitch_bot import pipeline
+from twitch_bot.pipeline import ChatPipeline, Timer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(pipeline, 'monotonic', clock)
+    return clock
+
+
+def test_timer_rate_over_the_window(clock):
+    timer = Timer(window=4, full_rate=2.)
+    timer.start()
+    assert timer.rate() == 0.
+    for _ in range(4):
+        timer.new_time()
+        clock.now += 0.5
+    assert timer.rate() == pytest.approx(3 / 2.)
+    assert timer.get_volume() == pytest.approx(0.75)
+
+
+def test_timer_start_does_not_count_as_a_command(clock):
+    timer = Timer()
+    timer.start()
+    timer.new_time()
+    assert len(timer.times) == 1
+    assert timer.rate() == 0.
+
+
+def test_timer_volume_is_capped(clock):
+    timer = Timer(full_rate=1.)
+    for _ in range(10):
+        timer.new_time()
+    assert timer.get_volume() == 1.
+
+
+def test_flush_publishes_the_most_common_command(clock):
+    published = []
+    chat = ChatPipeline(['leer', 'nadar'], published.append)
+
+    async def send(messages):
+        for message in messages:
+            await chat.ingest(message)
+
+    asyncio.run(send(['leer', '!nadar', 'hola', 'nadar']))
+    update = chat.flush()
+    assert published == [update]
+    assert update['COMMAND'] == 'nadar'
+    assert update['COUNTS'] == {'leer': 1, 'nadar': 2}
+    assert update['DIRECTION'] == 0
+
+
+def test_quiet_ticks_decay_the_volume_to_zero(clock):
+    published = []
+    chat = ChatPipeline(['leer'], published.append, timer=Timer(full_rate=2.))
+    for _ in range(8):
+        chat.record('leer')
+        clock.now += 0.1
+    assert chat.flush()['VOLUME'] == 1.
+    volumes = []
+    while True:
+        clock.now += 5.
+        update = chat.flush()
+        if update is None:
+            break
+        assert 'COMMAND' not in update and 'DIRECTION' not in update
+        volumes.append(update['VOLUME'])
+    assert volumes == sorted(volumes, reverse=True)
+    assert volumes[-1] == 0.
+    assert chat.flush() is None
+
+
+def test_no_update_before_any_command(clock):
+    published = []
+    chat = ChatPipeline(['leer'], published.append)
+    assert chat.flush() is None
+    assert published == []
@@ -0,0 +1,74 @@
+import json
+from threading import Event
+
+from backend.publish_queue import PublishQueue
+
+
+class Response:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+
+class Recorder:
+    def __init__(self, expected):
+        self.sent = []
+        self.release = Event()
+        self.finished = Event()
+        self.expected = expected
+
+    def __call__(self, name):
+        self.release.wait(5)
+        self.sent.append(name)
+        if len(self.sent) == self.expected:
+            self.finished.set()
+        return Response()
+
+
+def write_spool(spool_path, records):
+    with open(spool_path, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record) + '\n')
+
+
+def test_earlier_performance_is_sent_before_new_measures(tmp_path):
+    spool_path = str(tmp_path / 'spool.jsonl')
+    write_spool(spool_path, [{'id': idx, 'performance': 'old', 'kind': 'score',
+                              'measure': measure, 'args': [f'old{measure}']}
+                             for idx, measure in enumerate((100, 101, 102))])
+    recorder = Recorder(4)
+    queue = PublishQueue(spool_path, {'score': recorder}, 'new')
+    queue.enqueue('score', 1, 'new1')
+    recorder.release.set()
+    assert recorder.finished.wait(5)
+    queue.stop()
+    assert recorder.sent == ['old100', 'old101', 'old102', 'new1']
+
+
+def test_acknowledges_the_sent_entry(tmp_path):
+    spool_path = str(tmp_path / 'spool.jsonl')
+    write_spool(spool_path, [{'id': 0, 'performance': 'run', 'kind': 'score',
+                              'measure': 120, 'args': ['old120']}])
+    recorder = Recorder(2)
+    queue = PublishQueue(spool_path, {'score': recorder}, 'run')
+    queue.enqueue('score', 1, 'new1')
+    recorder.release.set()
+    assert recorder.finished.wait(5)
+    queue.stop()
+    assert sorted(recorder.sent) == ['new1', 'old120']
+    assert len(queue) == 0
+    with open(spool_path, 'r', encoding='utf-8') as file:
+        assert file.read() == ''
+
+
+def test_unacknowledged_entries_survive_a_restart(tmp_path):
+    spool_path = str(tmp_path / 'spool.jsonl')
+    failing = PublishQueue(spool_path, {'score': lambda name: None}, 'run',
+                           base_delay=10.)
+    failing.enqueue('score', 1, 'first')
+    failing.stop(timeout=1.)
+    recorder = Recorder(1)
+    recorder.release.set()
+    queue = PublishQueue(spool_path, {'score': recorder}, 'next')
+    assert recorder.finished.wait(5)
+    queue.stop()
+    assert recorder.sent == ['first']
@@ -0,0 +1,45 @@
+from backend.RenderCache import RenderCache
+
+
+def write_image(file_path, size):
+    with open(file_path, 'wb') as file:
+        file.write(b'\0' * size)
+    return str(file_path)
+
+
+def test_key_depends_only_on_the_source():
+    assert RenderCache.key('{ c }') == RenderCache.key('{ c }')
+    assert RenderCache.key('{ c }') != RenderCache.key('{ d }')
+
+
+def test_store_and_get(tmp_path):
+    cache = RenderCache(str(tmp_path / 'cache'))
+    key = cache.key('{ c }')
+    assert cache.get(key) is None
+    cached_path = cache.store(key, write_image(tmp_path / 'measure.png', 10))
+    assert cache.get(key) == cached_path
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate() == 0.5
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / 'cache'), max_size=25)
+    keys = [cache.key(source) for source in ('a', 'b', 'c')]
+    image = write_image(tmp_path / 'measure.png', 10)
+    cache.store(keys[0], image)
+    cache.store(keys[1], image)
+    cache.get(keys[0])
+    cache.store(keys[2], image)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.size == 20
+
+
+def test_reloads_entries_from_disk(tmp_path):
+    directory = str(tmp_path / 'cache')
+    key = RenderCache.key('{ c }')
+    RenderCache(directory).store(key, write_image(tmp_path / 'measure.png', 10))
+    cache = RenderCache(directory)
+    assert cache.get(key) is not None
+    assert cache.size == 10
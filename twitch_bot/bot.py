@@ -1,35 +1,40 @@
-from functools import reduce
-from time import time
+from threading import Event
 
 from PyQt5.QtCore import pyqtSignal, QThread
 from twitchio.ext import commands
 
 import twitch_bot.token_data as token_data
+from twitch_bot.pipeline import ChatPipeline, Timer
 
 
 class ControlBot(commands.Bot):
 
     def __init__(self, control_commands, signal_command, signal_start, channel_name,
-                 **kwargs):
+                 tick=0.5, aliases=(), **kwargs):
         super().__init__(token=token_data.OAUTH_TOKEN, client_id=token_data.CLIENT_ID,
                          prefix='!', nick='aTasteOfControl', initial_channels=[channel_name],
                          **kwargs)
         self.has_began = False
         self.timer = Timer()
         self.control_commands = control_commands
+        self.pipeline = ChatPipeline(control_commands, signal_command.emit, tick, self.timer,
+                                     aliases)
         self.has_ended = False
+        self.ended = Event()
         self.signal_command = signal_command
         self.signal_start = signal_start
 
     async def event_ready(self):
         print(f'Logged in as | {self.nick}')
         print(f'User id is | {self.user_id}')
+        self.pipeline.start()
 
     async def event_message(self, message):
         if message.echo:
             return
-        if message.content in self.control_commands:
-            await self.command_recieved(message.content)
+        command = self.pipeline.match(message.content)
+        if command is not None:
+            await self.command_recieved(command)
             return
 
         if message.author.name.lower() in token_data.ADMIN:
@@ -51,57 +56,27 @@ class ControlBot(commands.Bot):
         if self.has_began:
             self.has_ended = True
             self.has_began = False
+            self.ended.set()
+            self.pipeline.stop()
+            print("Commands received:", self.pipeline.matcher.report())
+            await self.close()
 
     async def command_recieved(self, command):
-        self.timer.new_time()
-        print(command)
-        volume = self.timer.get_volume()
-        update_data = {'DIRECTION': 0,
-                       'VOLUME': volume,
-                       "COMMAND": command}
-        self.signal_command.emit(update_data)
-
-
-class Timer:
-    def __init__(self):
-        self.last_time = 0
-        self.time_list = []
-        self.diff_list = []
-
-    def start(self):
-        self.last_time = time()
-        self.time_list.append(self.last_time)
-
-    def new_time(self):
-        new = time()
-        self.time_list.append(new)
-        self.diff_list.append(new - self.last_time)
-        self.last_time = new
-
-    def last_values(self, idx=4):
-        return self.diff_list[-idx:]
-
-    def get_volume(self):
-        diffs = self.last_values()
-        if len(diffs) < 2:
-            return 0.0
-        return reduce(lambda x, y: x / y, diffs, 0.8)
+        self.pipeline.record(command)
 
 
 class Messenger(QThread):
     signal_command = pyqtSignal(dict)
     signal_start = pyqtSignal()
 
-    def __init__(self, control_commands, channel_name):
+    def __init__(self, control_commands, channel_name, tick=0.5, aliases=()):
         super().__init__()
         self.bot = ControlBot(control_commands, self.signal_command,
-                              self.signal_start, channel_name)
+                              self.signal_start, channel_name, tick, aliases)
 
     def run(self):
         self.bot.run()
-        while not self.bot.has_ended:
-            continue
-        self.bot.end()
+        self.bot.ended.wait()
 
 
 if __name__ == "__main__":
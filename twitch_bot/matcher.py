@@ -0,0 +1,43 @@
+import unicodedata
+from collections import Counter
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text.strip().casefold())
+    text = ''.join(character for character in text if not unicodedata.combining(character))
+    return '_'.join(text.replace('_', ' ').split())
+
+
+class CommandMatcher:
+    def __init__(self, commands, aliases=(), prefix='!'):
+        lookup = {}
+        for command in commands:
+            lookup[normalize(command)] = command
+        for command, alias in zip(commands, aliases):
+            lookup.setdefault(normalize(alias), command)
+        self.exact = frozenset(commands)
+        self.lookup = lookup
+        self.prefix = prefix
+        self.max_length = max(map(len, lookup), default=0) + len(prefix or '') + 8
+        self.hits = Counter()
+
+    def match(self, content):
+        if content in self.exact:
+            command = content
+        elif len(content) > self.max_length:
+            return None
+        else:
+            text = content.strip()
+            if self.prefix and text.startswith(self.prefix):
+                text = text[len(self.prefix):]
+            command = self.lookup.get(normalize(text))
+            if command is None:
+                return None
+        self.hits[command] += 1
+        return command
+
+    def __contains__(self, content):
+        return self.match(content) is not None
+
+    def report(self):
+        return ', '.join(f"{command}: {hits}" for command, hits in self.hits.most_common())
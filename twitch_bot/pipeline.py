@@ -0,0 +1,103 @@
+import asyncio
+from collections import Counter, deque
+from time import monotonic
+
+from twitch_bot.matcher import CommandMatcher
+
+
+class Timer:
+    window = 16
+    full_rate = 4.
+    min_span = 0.25
+
+    def __init__(self, window=None, full_rate=None):
+        self.last_time = 0
+        self.times = deque(maxlen=window or self.window)
+        self.full_rate = full_rate or self.full_rate
+
+    def start(self):
+        self.last_time = monotonic()
+        self.times.clear()
+
+    def new_time(self):
+        new = monotonic()
+        self.times.append(new)
+        self.last_time = new
+
+    def rate(self):
+        if len(self.times) < 2:
+            return 0.
+        span = max(monotonic() - self.times[0], self.min_span)
+        return (len(self.times) - 1) / span
+
+    def get_volume(self):
+        return min(self.rate() / self.full_rate, 1.)
+
+
+class ChatPipeline:
+    min_volume = 0.05
+
+    def __init__(self, control_commands, publish, tick=0.5, timer=None, aliases=()):
+        self.matcher = CommandMatcher(control_commands, aliases)
+        self.publish = publish
+        self.tick = tick
+        self.timer = timer or Timer()
+        self.counts = Counter()
+        self.volume = 0.
+        self.task = None
+
+    def match(self, content):
+        return self.matcher.match(content)
+
+    def record(self, command):
+        self.timer.new_time()
+        self.counts[command] += 1
+
+    async def ingest(self, content):
+        command = self.match(content)
+        if command is None:
+            return None
+        self.record(command)
+        return command
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.flush()
+
+    def flush(self):
+        if not self.counts:
+            return self.decay()
+        counts, self.counts = self.counts, Counter()
+        command = counts.most_common(1)[0][0]
+        update_data = {'DIRECTION': 0,
+                       'VOLUME': self.timer.get_volume(),
+                       'COMMAND': command,
+                       'COUNTS': dict(counts),
+                       'RATE': self.timer.rate()}
+        print(f"{sum(counts.values())} commands, mostly {command}")
+        self.volume = update_data['VOLUME']
+        self.publish(update_data)
+        return update_data
+
+    def decay(self):
+        if self.volume == 0:
+            return None
+        volume = self.timer.get_volume()
+        if volume < self.min_volume:
+            volume = 0.
+        update_data = {'VOLUME': volume,
+                       'COUNTS': {},
+                       'RATE': self.timer.rate()}
+        self.volume = volume
+        self.publish(update_data)
+        return update_data
@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+from random import Random
+from time import perf_counter
+
+from backend.headless import HeadlessComposer
+from backend.pypond_extensions import MainDoc
+from parameters import COMMANDS, COMMANDS_TEST
+from twitch_bot.pipeline import ChatPipeline
+
+NOISE = ["hola", "jajaja", "que pasa", "!help", "buenas noches", "<3"]
+
+
+def recorded_messages(file_path, speed=1.):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for idx, line in enumerate(file):
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                yield record['t'] / speed, record['content']
+            else:
+                yield idx / speed, line
+
+
+def synthetic_messages(rate, duration, bursts=(), noise=0.3, seed=None):
+    rng = Random(seed)
+    commands = list(COMMANDS) + list(COMMANDS_TEST)
+    segments = [(0., duration, rate)] + list(bursts)
+    messages = []
+    for start, length, segment_rate in segments:
+        count = int(length * segment_rate)
+        for idx in range(count):
+            offset = start + idx / segment_rate
+            content = rng.choice(NOISE) if rng.random() < noise else rng.choice(commands)
+            messages.append((offset, content))
+    messages.sort(key=lambda message: message[0])
+    return messages
+
+
+class LatencyStats:
+    def __init__(self):
+        self.samples = []
+
+    def extend(self, samples):
+        self.samples.extend(samples)
+
+    def summary(self):
+        if not self.samples:
+            return "no samples"
+        ordered = sorted(self.samples)
+
+        def percentile(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+        return (f"{len(ordered)} samples, p50 {percentile(0.5):.1f} ms, "
+                f"p99 {percentile(0.99):.1f} ms, max {ordered[-1] * 1000:.1f} ms")
+
+
+class ReplayHarness:
+    def __init__(self, tick=0.5, measure_interval=6., compose=True, seed=None):
+        self.pipeline = ChatPipeline(COMMANDS, self.update_values, tick,
+                                     aliases=COMMANDS_TEST)
+        self.measure_interval = measure_interval
+        self.headless = HeadlessComposer(seed=seed) if compose else None
+        self.document = MainDoc() if compose else None
+        self.arrivals = []
+        self.applied = []
+        self.messages = 0
+        self.matched = 0
+        self.updates = 0
+        self.measures = 0
+        self.update_latency = LatencyStats()
+        self.measure_latency = LatencyStats()
+
+    async def event_message(self, content):
+        arrival = perf_counter()
+        self.messages += 1
+        if await self.pipeline.ingest(content) is not None:
+            self.matched += 1
+            self.arrivals.append(arrival)
+
+    def update_values(self, values):
+        if self.headless is not None:
+            self.headless.update_values(values)
+        now = perf_counter()
+        self.updates += 1
+        self.update_latency.extend(now - arrival for arrival in self.arrivals)
+        self.applied.extend(self.arrivals)
+        self.arrivals = []
+
+    def compose_measure(self):
+        if self.headless is None:
+            return
+        score, lines = self.headless.composer.compose()
+        self.document.document.score = score
+        self.document.create_file()
+        now = perf_counter()
+        self.measures += 1
+        self.measure_latency.extend(now - arrival for arrival in self.applied)
+        self.applied = []
+
+    async def measure_loop(self):
+        while True:
+            await asyncio.sleep(self.measure_interval)
+            self.compose_measure()
+
+    async def run(self, messages):
+        self.pipeline.start()
+        measures = asyncio.ensure_future(self.measure_loop())
+        start = perf_counter()
+        for idx, (offset, content) in enumerate(messages):
+            delay = start + offset - perf_counter()
+            if delay > 0.001:
+                await asyncio.sleep(delay)
+            elif idx % 100 == 0:
+                await asyncio.sleep(0)
+            await self.event_message(content)
+        elapsed = perf_counter() - start
+        await asyncio.sleep(self.pipeline.tick)
+        self.pipeline.stop()
+        self.pipeline.flush()
+        measures.cancel()
+        self.compose_measure()
+        if self.headless is not None:
+            self.headless.close()
+        return elapsed
+
+    def report(self, elapsed):
+        return (f"{self.messages} messages in {elapsed:.2f}s "
+                f"({self.messages / max(elapsed, 1e-9):.0f}/s), {self.matched} commands, "
+                f"{self.updates} updates, {self.measures} measures\n"
+                f"Message to update_values: {self.update_latency.summary()}\n"
+                f"Message to next measure:  {self.measure_latency.summary()}\n"
+                f"Commands: {self.pipeline.matcher.report()}")
+
+
+def parse_burst(text):
+    start, length, rate = (float(value) for value in text.split(':'))
+    return start, length, rate
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Replay chat messages into the bot pipeline.")
+    parser.add_argument('-f', '--file', help="recorded chat, plain lines or JSON lines "
+                                             "with 't' and 'content'")
+    parser.add_argument('--speed', type=float, default=1.)
+    parser.add_argument('-r', '--rate', type=float, default=20.)
+    parser.add_argument('-d', '--duration', type=float, default=10.)
+    parser.add_argument('-b', '--burst', action='append', type=parse_burst, default=[],
+                        help="start:duration:rate, e.g. 3:1:10000")
+    parser.add_argument('--noise', type=float, default=0.3)
+    parser.add_argument('--tick', type=float, default=0.5)
+    parser.add_argument('--measure-interval', type=float, default=6.)
+    parser.add_argument('--no-compose', action='store_true')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(arguments)
+
+    if args.file:
+        messages = recorded_messages(args.file, args.speed)
+    else:
+        messages = synthetic_messages(args.rate, args.duration, args.burst,
+                                      args.noise, args.seed)
+    harness = ReplayHarness(args.tick, args.measure_interval, not args.no_compose, args.seed)
+    elapsed = asyncio.run(harness.run(messages))
+    print(harness.report(elapsed))
+
+
+if __name__ == "__main__":
+    main()